@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.db import transaction
+
+# Short TTL bounds how long a racing reader can keep a superseded version cached
+AUTH_VERSION_TIMEOUT = 5 * 60
+
+
+def _auth_version_key(user_id):
+    return f'accounts:auth-version:{user_id}'
+
+
+def get_auth_version(user_id):
+    """
+    Current auth version of a user, from the cache or else the database
+
+    Returns:
+        int or None: None when the user no longer exists
+    """
+    key = _auth_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        from .models import User
+        version = (
+            User.objects.filter(pk=user_id)
+            .values_list('auth_version', flat=True)
+            .first()
+        )
+        if version is not None:
+            cache.set(key, version, AUTH_VERSION_TIMEOUT)
+    return version
+
+
+def remember_auth_version(user_id, version):
+    """Cache a user's new auth version once the surrounding transaction commits"""
+    key = _auth_version_key(user_id)
+    transaction.on_commit(lambda: cache.set(key, version, AUTH_VERSION_TIMEOUT))
+
+
+def forget_auth_versions(user_ids):
+    """Drop cached auth versions after commit so the next request reads the database"""
+    keys = [_auth_version_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
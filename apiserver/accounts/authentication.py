@@ -0,0 +1,32 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .auth_versions import get_auth_version
+from .tokens import USER_CLAIM, user_from_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds request.user from the access token's claims
+
+    The token's auth version is checked against the user's current one (a cache
+    read, or one query on a miss), so no user SELECT runs per request. Any change
+    to the user bumps the version, so deactivation, role and password changes
+    reject the outstanding access tokens at once; clients refresh to get current
+    claims. Tokens without profile claims fall back to the usual database lookup.
+    """
+
+    def get_user(self, validated_token):
+        claims = validated_token.get(USER_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if not claims or user_id is None:
+            return super().get_user(validated_token)
+        if claims.get('auth_version') != get_auth_version(user_id):
+            raise AuthenticationFailed(
+                'The user changed since this token was issued, refresh it.',
+                code='token_outdated',
+            )
+        if not claims['active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user_from_claims(user_id, claims)
@@ -1,8 +1,29 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Upper
 
+from .auth_versions import forget_auth_versions, remember_auth_version
 
-class UserManager(BaseUserManager):
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        # Any change may affect access-token claims, so bulk updates bump the version
+        kwargs.setdefault('auth_version', F('auth_version') + 1)
+        user_ids = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        forget_auth_versions(user_ids)
+        return updated
+
+    def delete(self):
+        user_ids = list(self.values_list('pk', flat=True))
+        result = super().delete()
+        forget_auth_versions(user_ids)
+        return result
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, password=None):
         """
         Creates and saves a User with the given email and password.
@@ -81,9 +102,75 @@ class User(AbstractBaseUser):
     staff = models.BooleanField(default=False)  
     admin = models.BooleanField(default=False)  
 
+    # Bumped on every change; access tokens carrying an older version are re-checked
+    # against the database, so deactivation and role changes apply immediately
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
+
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []  
 
+    class Meta:
+        # Trigram indexes on UPPER(col) match the SQL Django emits for icontains
+        indexes = [
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="user_email_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("first_name"), name="gin_trgm_ops"),
+                name="user_first_name_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("last_name"), name="gin_trgm_ops"),
+                name="user_last_name_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("designation"), name="gin_trgm_ops"),
+                name="user_designation_trgm",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the name as loaded so a rename can be pushed to the user's timesheets
+        loaded = dict(zip(field_names, values, strict=True))
+        if 'first_name' in loaded and 'last_name' in loaded:
+            instance._loaded_full_name = f"{loaded['first_name']} {loaded['last_name']}"
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        bump = not self._state.adding and not (
+            update_fields is not None and set(update_fields) <= {'last_login'}
+        )
+        if bump:
+            # Incremented in SQL so concurrent saves cannot lose a bump
+            self.auth_version = F('auth_version') + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'auth_version'}
+        full_name = self.get_full_name()
+        renamed = getattr(self, '_loaded_full_name', full_name) != full_name
+        super().save(*args, **kwargs)
+        if bump:
+            self.refresh_from_db(using=self._state.db, fields=['auth_version'])
+            remember_auth_version(self.pk, self.auth_version)
+        if renamed:
+            from timesheets.tasks import propagate_user_name
+            user_id = self.pk
+            # Robust: a broker outage must not fail the save, sweep_stale_names
+            # catches up on renames whose task was never queued
+            transaction.on_commit(
+                lambda: propagate_user_name.delay(user_id), robust=True
+            )
+        self._loaded_full_name = self.get_full_name()
+
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        forget_auth_versions([user_id])
+        return result
+
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -1,3 +1,108 @@
-# from django.test import TestCase
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from apiserver.testing import QueryBudgetMixin
+from .models import User
+from .tokens import UserRefreshToken
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AccountQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    urlconf = 'accounts.urls'
+    query_budgets = {
+        'register': {'post': 4},
+        'test': {'get': 0},
+        'user-profile': {'get': 0, 'put': 2},
+        'change-password': {'put': 2},
+        'login': {'post': 1},
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='budget@example.com', password='secret'
+        )
+        self.client.force_authenticate(self.user)
+
+    def seed(self, rows):
+        """`rows` other users alongside the authenticated one"""
+        User.objects.bulk_create(
+            User(email=f'user{index}@example.com') for index in range(rows)
+        )
+        return {}
+
+    def build_request(self, name, label, context):
+        if name == 'register':
+            return {}, {
+                'email': 'new@example.com', 'password': 'secret', 'first_name': 'New'
+            }
+        if name == 'user-profile' and label == 'put':
+            return {}, {'first_name': 'Budget', 'designation': 'employee'}
+        if name == 'change-password':
+            return {}, {'old_password': 'secret', 'new_password': 'secret'}
+        if name == 'login':
+            return {}, {'email': 'budget@example.com', 'password': 'secret'}
+        return {}, {}
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ClaimsAuthenticationTests(APITestCase):
+    url = reverse('user-profile')
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='claims@example.com', password='secret'
+        )
+        self.token = str(UserRefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def save_user(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_current_token_needs_no_query_once_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['email'], 'claims@example.com')
+
+    def test_cache_miss_reads_version_from_database(self):
+        self.save_user()
+        self.token = str(UserRefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_token_rejected_after_deactivation(self):
+        self.user.active = False
+        self.save_user()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['detail'].code, 'token_outdated')
+
+    def test_token_rejected_after_password_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                reverse('change-password'),
+                {'old_password': 'secret', 'new_password': 'changed'},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_token_rejected_after_version_bump(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(designation='manager')
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_concurrent_saves_each_bump_version(self):
+        stale = User.objects.get(pk=self.user.pk)
+        self.save_user()
+        stale.save()
+        self.assertEqual(stale.auth_version, 2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.auth_version, 2)
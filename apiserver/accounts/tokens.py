@@ -0,0 +1,59 @@
+from django.db import router
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User
+
+# Access tokens carry the profile the views read, under this claim
+USER_CLAIM = 'usr'
+CLAIM_FIELDS = ['email', 'first_name', 'last_name', 'designation', 'company', 'active',
+                'staff', 'admin', 'auth_version']
+
+
+def user_claims(user):
+    """Profile fields embedded in a user's tokens"""
+    claims = {field: getattr(user, field) for field in CLAIM_FIELDS}
+    claims['last_login'] = user.last_login.isoformat() if user.last_login else None
+    return claims
+
+
+def user_from_claims(user_id, claims):
+    """
+    A User instance built from token claims without a query
+
+    The password is left deferred and loads on first access; save() writes only the
+    loaded fields.
+    """
+    loaded = {field: claims[field] for field in CLAIM_FIELDS}
+    loaded.update(id=user_id, last_login=parse_datetime(claims['last_login'] or ''))
+    # from_db expects values in concrete field order
+    fields = [
+        field.attname for field in User._meta.concrete_fields if field.attname in loaded
+    ]
+    values = [loaded[field] for field in fields]
+    return User.from_db(router.db_for_read(User), fields, values)
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's profile claims"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[USER_CLAIM] = user_claims(user)
+        return token
+
+    @property
+    def access_token(self):
+        if self.token is not None:
+            # Refreshing a client's token: re-read the user so the new access token
+            # is current
+            user = User.objects.filter(pk=self[api_settings.USER_ID_CLAIM]).first()
+            if user is None or not user.is_active:
+                raise AuthenticationFailed(
+                    'User is inactive or no longer exists', code='user_inactive'
+                )
+            self[USER_CLAIM] = user_claims(user)
+        return super().access_token
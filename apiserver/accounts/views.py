@@ -1,8 +1,11 @@
 
+from django.db.models import Q
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from apiserver.db_router import replica_reads
+from apiserver.pagination import EstimatedCountPaginator, wants_estimated_count
 from .models import User
 
 
@@ -180,8 +183,8 @@ def login_user(request):
     try:
         user = User.objects.get(email=email)
         if user.check_password(password):
-            from rest_framework_simplejwt.tokens import RefreshToken
-            refresh = RefreshToken.for_user(user)
+            from .tokens import UserRefreshToken
+            refresh = UserRefreshToken.for_user(user)
             
             return Response({
                 'message': 'Login successful',
@@ -216,6 +219,7 @@ def is_admin_user(user):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def list_users(request):
     """List all users - Admin only"""
     if not is_admin_user(request.user):
@@ -227,7 +231,7 @@ def list_users(request):
         # Get all users
         users = User.objects.all().order_by('-id')
         
-        # Search functionality
+        # Search functionality - served by the trigram indexes on User
         search = request.GET.get('search', '')
         if search:
             users = users.filter(
@@ -246,7 +250,9 @@ def list_users(request):
         
         # Pagination
         page_size = min(int(request.GET.get('page_size', 50)), 100)
-        paginator = paginator(users, page_size)
+        paginator = EstimatedCountPaginator(
+            users, page_size, estimate=wants_estimated_count(request)
+        )
         page_number = request.GET.get('page', 1)
         page_obj = paginator.get_page(page_number)
         
@@ -275,6 +281,7 @@ def list_users(request):
                 'current_page': page_obj.number,
                 'total_pages': paginator.num_pages,
                 'total_count': paginator.count,
+                'count_is_exact': paginator.count_is_exact,
                 'has_next': page_obj.has_next(),
                 'has_previous': page_obj.has_previous()
             }
@@ -11,6 +11,9 @@ python manage.py migrate
 echo "Collect static"
 python manage.py collectstatic --noinput
 
-# Start the development server
-echo "Runserver"
-python manage.py runserver 0.0.0.0:8000
+# Serve the ASGI application, so async views run on the event loop
+echo "Gunicorn"
+exec gunicorn apiserver.asgi:application \
+    --worker-class uvicorn.workers.UvicornWorker \
+    --workers "${GUNICORN_WORKERS:-3}" \
+    --bind "0.0.0.0:${SERVER_PORT:-8000}"
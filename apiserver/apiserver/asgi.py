@@ -0,0 +1,20 @@
+"""
+ASGI config for apiserver project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with uvicorn workers under gunicorn so async views (AsyncAPIView) don't
+hold a worker while they wait on the database:
+
+    gunicorn apiserver.asgi:application -k uvicorn.workers.UvicornWorker
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "apiserver.settings")
+
+application = get_asgi_application()
@@ -0,0 +1,52 @@
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+from .db_router import choose_replica, using_replica
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines, for serving under ASGI
+
+    DRF dispatches synchronously, so this runs the same request cycle with the
+    synchronous steps (authentication, permission and throttle checks, which may
+    hit the database or cache) in a thread and awaits the handler on the event
+    loop. Handlers must not touch the ORM synchronously: use the async queryset
+    API (aget, acount, aaggregate, async for) or sync_to_async.
+
+    Set `use_read_replica = True` to serve the handler's reads from a replica, as
+    the replica_reads decorator does for synchronous views.
+    """
+
+    use_read_replica = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            alias = None
+            if self.use_read_replica:
+                alias = await sync_to_async(choose_replica)(request.user)
+            with using_replica(alias):
+                response = handler(request, *args, **kwargs)
+                if hasattr(response, "__await__"):
+                    response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,171 @@
+"""
+Route the read-only analytics endpoints to read replicas.
+
+Reads go to a replica only inside `read_from_replica()`, which views opt into with
+the `replica_reads` decorator or, for async views, AsyncAPIView.use_read_replica.
+Everything else, and every write, uses "default". A replica is skipped while the
+requesting user has written recently (read-your-writes) or while its replication
+lag is above REPLICA_MAX_LAG_SECONDS.
+"""
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+_read_alias = ContextVar("replica_read_alias", default=None)
+
+# Seconds of replay lag; zero when the replica has replayed everything it received
+LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+def _sticky_key(user_id):
+    return f"db:sticky:{user_id}"
+
+
+def _lag_key(alias):
+    return f"db:replica-lag:{alias}"
+
+
+def mark_recent_write(user_id):
+    """Keep the user's reads on the primary for REPLICA_STICKY_SECONDS"""
+    cache.set(_sticky_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def replica_lag(alias):
+    """
+    Replication lag of a replica in seconds, cached for REPLICA_LAG_CHECK_SECONDS
+
+    An unreachable replica reports infinite lag so it is skipped until the next check.
+    """
+    lag = cache.get(_lag_key(alias))
+    if lag is None:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0] or 0)
+        except DatabaseError:
+            logger.warning(f"Replica {alias} is unreachable, reading from the primary")
+            lag = float("inf")
+        cache.set(_lag_key(alias), lag, settings.REPLICA_LAG_CHECK_SECONDS)
+    return lag
+
+
+def choose_replica(user=None):
+    """A replica alias fit to serve this user's reads, or None for the primary"""
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return None
+    if user is not None and user.is_authenticated and cache.get(_sticky_key(user.pk)):
+        return None
+    max_lag = settings.REPLICA_MAX_LAG_SECONDS
+    healthy = [alias for alias in replicas if replica_lag(alias) <= max_lag]
+    return random.choice(healthy) if healthy else None  # noqa: S311 - load spreading
+
+
+@contextmanager
+def using_replica(alias):
+    """Send the reads made inside the block to `alias`; None keeps the primary"""
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+def current_read_alias():
+    """The alias reads are routed to in this context; None is the primary"""
+    return _read_alias.get()
+
+
+def read_from_replica(user=None):
+    """Send the reads made inside the block to a replica fit to serve them"""
+    return using_replica(choose_replica(user))
+
+
+def replica_reads(view_func):
+    """
+    Serve a read-only view from a replica
+
+    Wrap the handler after authentication: place it under @api_view, or use
+    method_decorator on an APIView's get().
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        with read_from_replica(request.user):
+            return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, so objects loaded from a replica are still saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """Record users who just wrote, so their next reads stay on the primary"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.may_have_written(request):
+            self.remember_write(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.may_have_written(request):
+            # request.user may still be a lazy session lookup
+            await sync_to_async(self.remember_write)(request)
+        return response
+
+    @staticmethod
+    def may_have_written(request):
+        if not settings.DATABASE_REPLICAS:
+            return False
+        return request.method not in ("GET", "HEAD", "OPTIONS")
+
+    @staticmethod
+    def remember_write(request):
+        # DRF copies the user it authenticated (e.g. from a JWT) onto the request
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            mark_recent_write(user.pk)
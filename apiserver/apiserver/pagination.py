@@ -0,0 +1,260 @@
+import base64
+import binascii
+import json
+from functools import cached_property, reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Below this many estimated rows an exact COUNT is cheap enough to always run
+ESTIMATED_COUNT_THRESHOLD = 10_000
+COUNT_MODE_PARAM = "count"
+
+
+def wants_estimated_count(request):
+    """Whether the request opted into estimated totals with ?count=estimated"""
+    return request.GET.get(COUNT_MODE_PARAM) == "estimated"
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for a queryset, from EXPLAIN
+
+    The planner works from table statistics (reltuples and column histograms), so
+    this costs a plan, not a scan. Returns None on databases other than PostgreSQL.
+    """
+    connection = connections[queryset.db or router.db_for_read(queryset.model)]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_with_estimate(queryset, threshold=ESTIMATED_COUNT_THRESHOLD):
+    """
+    Total for a queryset, estimated when large
+
+    Returns:
+        tuple: (count, is_exact) - an exact COUNT when the estimate is below
+        `threshold` or unavailable, the planner estimate otherwise
+    """
+    estimate = estimate_count(queryset)
+    if estimate is None or estimate < threshold:
+        return queryset.count(), True
+    return estimate, False
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django Paginator whose count is a planner estimate for large querysets.
+
+    `count_is_exact` tells whether the total was actually counted. With
+    estimate=False it behaves like the stock Paginator.
+    """
+
+    def __init__(
+        self, *args, estimate=True, threshold=ESTIMATED_COUNT_THRESHOLD, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.estimate = estimate
+        self.threshold = threshold
+        self.count_is_exact = True
+
+    @cached_property
+    def count(self):
+        if not self.estimate or not hasattr(self.object_list, "query"):
+            return super().count
+        count, self.count_is_exact = count_with_estimate(
+            self.object_list, self.threshold
+        )
+        return count
+
+
+class EstimatedCountLimitOffsetPagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination estimating large totals when asked with ?count=estimated
+
+    `exact_count` is a total the caller already holds, e.g. summed from a rollup;
+    unless an estimate is asked for it is used instead of running a COUNT.
+    """
+
+    def __init__(self, exact_count=None):
+        self.exact_count = exact_count
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_is_exact = True
+        self.estimate = wants_estimated_count(request)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        if not self.estimate and self.exact_count is not None:
+            return self.exact_count
+        if not self.estimate or not hasattr(queryset, "query"):
+            return super().get_count(queryset)
+        count, self.count_is_exact = count_with_estimate(queryset)
+        return count
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["count_is_exact"] = self.count_is_exact
+        return response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination keyed on the values of the last row of a page.
+
+    Each page is fetched with a WHERE clause on the ordering columns instead of an
+    OFFSET, so page N costs the same as page 1. `ordering` must end in a unique
+    column so that every row has a distinct position, and all its columns should
+    run in the same direction so one index range serves the whole predicate.
+
+    When `fallback_class` is set, requests without a `cursor` parameter keep the
+    fallback's behaviour; pass an empty `cursor=` to ask for the first keyset page.
+    """
+
+    ordering = ("-date", "-created_at", "-id")
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    fallback_class = None
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.fallback = self.fallback_class() if self.fallback_class else None
+        self.use_fallback = False
+
+    @classmethod
+    def is_requested(cls, request):
+        """Whether the request asks for keyset pagination"""
+        return cls.cursor_query_param in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            size = int(
+                request.query_params.get(self.page_size_query_param, self.page_size)
+            )
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_fallback = self.fallback is not None and not self.is_requested(request)
+        if self.use_fallback:
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.page_size_used = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            position = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._after(queryset.model, position))
+
+        rows = list(queryset[: self.page_size_used + 1])
+        self.has_more = len(rows) > self.page_size_used
+        rows = rows[: self.page_size_used]
+        self.next_cursor = None
+        if self.has_more:
+            self.next_cursor = self.encode_cursor(self._position(rows[-1]))
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.use_fallback:
+            return self.fallback.get_paginated_response(data)
+        return Response(
+            {
+                "next_cursor": self.next_cursor,
+                "has_more": self.has_more,
+                "page_size": self.page_size_used,
+                "results": data,
+            }
+        )
+
+    def get_pagination_info(self):
+        """Pagination metadata for views that build their own response payload"""
+        return {
+            "next_cursor": self.next_cursor,
+            "has_more": self.has_more,
+            "page_size": self.page_size_used,
+        }
+
+    def _fields(self):
+        return [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+
+    def _position(self, row):
+        # Rows are model instances, or dicts when the queryset was narrowed by values()
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self._fields()]
+        return [getattr(row, name) for name, _ in self._fields()]
+
+    def _after(self, model, values):
+        """Rows strictly after the given position in `ordering`"""
+        fields = self._fields()
+        if len(values) != len(fields):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            parsed = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(fields, values, strict=True)
+            ]
+        except (DjangoValidationError, TypeError, ValueError):
+            # Well-formed JSON of the wrong shape, e.g. a list where a date belongs
+            raise NotFound(self.invalid_cursor_message) from None
+
+        clauses = []
+        for index, (name, descending) in enumerate(fields):
+            equal_prefix = {fields[prev][0]: parsed[prev] for prev in range(index)}
+            lookup = f"{name}__lt" if descending else f"{name}__gt"
+            clauses.append(Q(**equal_prefix, **{lookup: parsed[index]}))
+        # Implied by the OR, but lets the planner scan a single index range on
+        # the leading column instead of reading and sorting the skipped rows
+        lead, descending = fields[0]
+        bound = Q(**{f"{lead}__lte" if descending else f"{lead}__gte": parsed[0]})
+        return bound & reduce(or_, clauses)
+
+    def encode_cursor(self, values):
+        values = [v.isoformat() if hasattr(v, "isoformat") else v for v in values]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message) from None
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+
+class TimesheetKeysetPagination(KeysetPagination):
+    """Timesheet listings, newest day first"""
+
+    ordering = ("-date", "-created_at", "-id")
+    fallback_class = EstimatedCountLimitOffsetPagination
+
+
+class DraftKeysetPagination(KeysetPagination):
+    """Draft listings, most recently created first"""
+
+    ordering = ("-created_at", "-id")
+
+
+class ProjectKeysetPagination(KeysetPagination):
+    """Project listings, alphabetical"""
+
+    ordering = ("name", "id")
@@ -0,0 +1,55 @@
+import re
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# orjson and the stdlib print a float differently only where Python switches to
+# exponent notation (abs(x) < 1e-4 or >= 1e16), which orjson writes as "1e16",
+# "1e-7" or "0.00001"; output that may hold such a number is re-rendered with the
+# stdlib encoder. Both checks run at C speed and key on the end of a number token
+# or a rare literal, so ids and hashes inside strings do not trip them; text that
+# really looks like "e5," only costs the slower path.
+_EXPONENT = re.compile(rb"e-?[0-9]+(?:[,}\]]|\Z)")
+_SMALL_FLOAT = b"0.0000"
+_LINE_SEPARATORS = (b"\xe2\x80\xa8", b"\xe2\x80\xa9")  # U+2028, U+2029 in UTF-8
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # orjson handles str, numbers, dates, times, datetimes and UUIDs itself; the rest
+    # (Decimal as float, lazy strings, QuerySets, ...) go through DRF's encoder
+    return JSONRenderer.encoder_class().default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same bytes through orjson
+
+    Used for compact output, which is what API clients get; indented output (the
+    browsable API, `; indent=` media type parameters) and anything orjson cannot
+    encode exactly like the stdlib fall back to the DRF renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            self.get_indent(accepted_media_type, renderer_context or {}) is not None
+            or not self.compact
+            or self.ensure_ascii
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the DRF renderer handles or reports them
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if _SMALL_FLOAT in ret or _EXPONENT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like DRF does, so the output stays a strict JavaScript subset
+        if _LINE_SEPARATORS[0] in ret or _LINE_SEPARATORS[1] in ret:
+            ret = ret.replace(_LINE_SEPARATORS[0], b"\\u2028")
+            ret = ret.replace(_LINE_SEPARATORS[1], b"\\u2029")
+        return ret
@@ -77,6 +77,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "apiserver.db_router.ReplicaStickinessMiddleware",
+    "apiserver.throttling.CostThrottleMiddleware",
 ]
 
 ROOT_URLCONF = "apiserver.urls"
@@ -98,6 +100,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "apiserver.wsgi.application"
+ASGI_APPLICATION = "apiserver.asgi.application"
 
 
 # Database
@@ -113,6 +116,28 @@ DATABASES = {
     }
 }
 
+# Read replicas for the analytics endpoints - set in localsettings. Each alias must be
+# defined in DATABASES (with "TEST": {"MIRROR": "default"}); none means every query
+# goes to "default".
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ["apiserver.db_router.ReplicaRouter"]
+# After a write, a user's reads stay on the primary this long (read-your-writes);
+# keep it above REPLICA_MAX_LAG_SECONDS so a replica has caught up when it expires
+REPLICA_STICKY_SECONDS = 10
+# A replica further behind than this is skipped; lag is re-measured at most this often
+REPLICA_MAX_LAG_SECONDS = 5
+REPLICA_LAG_CHECK_SECONDS = 5
+
+# Concurrent requests allowed per cost class (see apiserver.throttling): per user and
+# across all workers, the longest a slot is held if never released, and the
+# Retry-After sent with a 429. Views without a cost class are not limited.
+THROTTLE_COST_CLASSES = {
+    "heavy": {"per_user": 1, "global": 4, "lease_seconds": 300, "retry_after": 10},
+    "medium": {"per_user": 3, "global": 12, "lease_seconds": 60, "retry_after": 2},
+}
+# Reports over a longer date range than this count as heavy
+THROTTLE_HEAVY_RANGE_DAYS = 92
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.contrib.gis.db.backends.postgis',
@@ -169,11 +194,23 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "apiserver.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "apiserver.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "apiserver.throttling.CostClassThrottle",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 20,
 }
@@ -209,6 +246,8 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_EXP_CLAIM": "refresh_exp",
     "SLIDING_TOKEN_LIFETIME": timedelta(minutes=5),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.serializers.UserTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.UserTokenRefreshSerializer",
 }
 
 OTP_LENGTH = 6
@@ -293,6 +332,29 @@ CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
+CELERY_BEAT_SCHEDULE = {
+    "cleanup-expired-timesheet-exports": {
+        "task": "timesheets.tasks.cleanup_expired_exports",
+        "schedule": timedelta(hours=1),
+    },
+    "maintain-timesheet-partitions": {
+        "task": "timesheets.tasks.maintain_timesheet_partitions",
+        "schedule": timedelta(days=1),
+    },
+    "sweep-stale-timesheet-names": {
+        "task": "timesheets.tasks.sweep_stale_names",
+        "schedule": timedelta(days=1),
+    },
+}
+
+# Timesheet export jobs - files are written under MEDIA_ROOT and removed after the TTL
+TIMESHEET_EXPORT_DIR = os.path.join(MEDIA_ROOT, "exports")
+TIMESHEET_EXPORT_TTL = timedelta(hours=24)
+
+# Monthly timesheet partitions - months created ahead of time, and how long to keep
+# a month attached before detaching it as an archive table (None keeps everything)
+TIMESHEET_PARTITION_MONTHS_AHEAD = 3
+TIMESHEET_PARTITION_RETENTION_MONTHS = 84
 
 # Celery Settings - Move to localsettings on Production Environment
 # CELERY_BROKER_URL = "redis://localhost:6379"
@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from importlib import import_module
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class QueryBudgetMixin(ABC):
+    """
+    Assert that every route of an app runs a constant number of SQL queries.
+
+    Each endpoint is exercised against 1, 10 and 100 seeded rows. The test fails
+    when the query count keeps growing with the row count (an N+1) or exceeds the
+    budget declared for the endpoint, and prints the SQL of the worst run.
+
+    Mix into an APITestCase, set `urlconf` and `query_budgets`, and implement
+    `seed()` and `build_request()`. Budgets are keyed by url name, then by request
+    label: the HTTP method, optionally followed by ":variant" to test one route
+    several ways (e.g. "post:submit").
+    """
+
+    urlconf = None
+    query_budgets = {}
+    row_counts = (1, 10, 100)
+
+    @abstractmethod
+    def seed(self, rows):
+        """Create `rows` rows of fixture data and return whatever build_request needs"""
+
+    @abstractmethod
+    def build_request(self, name, label, context):
+        """
+        Arguments for one request
+
+        Returns:
+            tuple: (url kwargs, payload) - the payload is sent as query params for
+            GET and as JSON otherwise
+        """
+
+    def test_every_route_has_a_budget(self):
+        patterns = import_module(self.urlconf).urlpatterns
+        names = {pattern.name for pattern in patterns if pattern.name}
+        missing = sorted(names - self.query_budgets.keys())
+        self.assertFalse(
+            missing, f"Routes in {self.urlconf} without a query budget: {missing}"
+        )
+
+    def test_query_budgets(self):
+        for name, budgets in self.query_budgets.items():
+            for label, budget in budgets.items():
+                with self.subTest(endpoint=name, request=label):
+                    self.assert_query_budget(name, label, budget)
+
+    def assert_query_budget(self, name, label, budget):
+        runs = {
+            rows: self.capture_queries(name, label, rows) for rows in self.row_counts
+        }
+        counts = {rows: len(queries) for rows, queries in runs.items()}
+        worst = max(runs, key=lambda rows: counts[rows])
+        # The smallest run may skip a statement (e.g. nothing left to upsert), so
+        # growth is judged between the two largest row counts
+        *_, smaller, largest = self.row_counts
+        if counts[largest] > counts[smaller] or counts[worst] > budget:
+            sql = "\n".join(f"  {query['sql']}" for query in runs[worst])
+            self.fail(
+                f"{label.upper()} {name}: queries per row count {counts}, "
+                f"budget {budget} (must be constant).\nSQL for {worst} rows:\n{sql}"
+            )
+
+    def capture_queries(self, name, label, rows):
+        """Seed `rows` rows, make the request and return its queries, then roll back"""
+        savepoint = transaction.savepoint()
+        cache.clear()
+        try:
+            kwargs, payload = self.build_request(name, label, self.seed(rows))
+            url = reverse(name, kwargs=kwargs)
+            method = label.split(":")[0]
+            options = {} if method == "get" else {"format": "json"}
+            with CaptureQueriesContext(connection) as captured:
+                response = getattr(self.client, method)(url, payload, **options)
+                content = (b"".join(response.streaming_content) if response.streaming
+                           else response.content)
+            response.close()
+            self.assertLess(
+                response.status_code, 400,
+                f"{label.upper()} {url} with {rows} rows returned "
+                f"{response.status_code}: {content[:500]}",
+            )
+            return captured.captured_queries
+        finally:
+            transaction.savepoint_rollback(savepoint)
@@ -0,0 +1,257 @@
+import base64
+import io
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from itertools import product
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from .db_router import ReplicaStickinessMiddleware, _lag_key, _sticky_key
+from .pagination import DraftKeysetPagination, TimesheetKeysetPagination
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer
+from .throttling import CostThrottleMiddleware, _slot_keys, acquire_slot
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def assertRendersLikeDRF(self, data, media_type=None):
+        expected = JSONRenderer().render(data, media_type)
+        self.assertEqual(ORJSONRenderer().render(data, media_type), expected)
+
+    def test_api_types(self):
+        ist = timezone(timedelta(hours=5, minutes=30))
+        self.assertRendersLikeDRF({
+            'id': 7, 'hours': Decimal('7.25'), 'total': 37.5, 'ok': True,
+            'missing': None, 'date': date(2024, 3, 4), 'time': time(9, 30, 15, 120),
+            'created_at': datetime(2024, 3, 4, 9, 30, 15, 123456, tzinfo=ist),
+            'utc': datetime(2024, 3, 4, 9, 30, tzinfo=timezone.utc),
+            'naive': datetime(2024, 3, 4, 9, 30), 'uuid': uuid.UUID(int=1),
+            'lazy': gettext_lazy('Draft'), 'items': ({'a': 1}, [2, 3]), 7: 'int key',
+        })
+
+    def test_strings(self):
+        self.assertRendersLikeDRF(
+            ['Zoë "quoted" \\ \t\n\x00\x1f\x7f', '日本', '😀', 'a b c', '</script>']
+        )
+
+    def test_floats_outside_the_shared_notation(self):
+        self.assertRendersLikeDRF(
+            [1e16, 1.5e20, -1e-7, 0.00001234, 0.0001, 9990000000000000.0, 1e-05]
+        )
+        self.assertRendersLikeDRF(1e16)
+        self.assertRendersLikeDRF({'big': 2 ** 70})
+
+    def test_indented_output_and_empty_body(self):
+        self.assertRendersLikeDRF({'a': [1, 2]}, 'application/json; indent=4')
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(
+            io.BytesIO(body), 'application/json', {'encoding': encoding}
+        )
+
+    def test_parses_like_drf(self):
+        body = (
+            '{"hours": "7.25", "total": 1.5, "ids": [1, 2], "name": "Zoë",'
+            ' "big": 18446744073709551616}'
+        ).encode()
+        self.assertEqual(
+            self.parse(ORJSONParser(), body), self.parse(JSONParser(), body)
+        )
+
+    def test_other_encodings(self):
+        body = '{"name": "Zoë"}'.encode('latin-1')
+        self.assertEqual(self.parse(ORJSONParser(), body, 'latin-1'), {'name': 'Zoë'})
+
+    def test_invalid_body(self):
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            self.parse(ORJSONParser(), b'{"hours": ')
+        with self.assertRaises(ParseError):
+            self.parse(ORJSONParser(), b'{"total": NaN}')
+
+
+class KeysetPaginationTests(APITestCase):
+    def walk(self, paginator_class, queryset, page_size):
+        """Ids of every page, following next_cursor from the first page"""
+        from rest_framework.request import Request
+
+        pages, cursor = [], ''
+        while cursor is not None:
+            params = {'cursor': cursor, 'page_size': page_size}
+            request = Request(APIRequestFactory().get('/', params))
+            paginator = paginator_class()
+            page = paginator.paginate_queryset(queryset, request)
+            pages.append([row.id for row in page])
+            cursor = paginator.next_cursor
+        return pages
+
+    def test_ties_on_every_ordering_column_but_id(self):
+        from accounts.models import User
+        from projects.models import Project
+        from timesheets.models import Timesheet
+
+        user = User.objects.create_user(email='pages@example.com', password='secret')
+        projects = Project.objects.bulk_create(
+            Project(name=f'Project {index}') for index in range(7)
+        )
+        days = [date(2024, 3, 4), date(2024, 3, 5)]
+        Timesheet.objects.bulk_create(
+            Timesheet(user=user, project=project, activity_type='Development',
+                      date=day, hours_worked='1.00')
+            for project, day in product(projects, days)
+        )
+        # Two timestamps shared by many rows, so only the id tells rows apart
+        first = datetime(2024, 3, 6, 9, tzinfo=timezone.utc)
+        second = datetime(2024, 3, 6, 10, tzinfo=timezone.utc)
+        timesheets = Timesheet.objects.all()
+        timesheets.filter(project__in=projects[:3]).update(created_at=first)
+        timesheets.filter(project__in=projects[3:]).update(created_at=second)
+
+        for paginator_class in (TimesheetKeysetPagination, DraftKeysetPagination):
+            ordered = timesheets.order_by(*paginator_class.ordering)
+            expected = list(ordered.values_list('id', flat=True))
+            for size in (1, 3, 4):
+                with self.subTest(paginator=paginator_class.__name__, size=size):
+                    pages = self.walk(paginator_class, timesheets, size)
+                    # Every row exactly once, in order, however the pages fall
+                    self.assertEqual([row for page in pages for row in page], expected)
+                    self.assertTrue(all(len(page) <= size for page in pages))
+
+    def test_leading_column_is_bounded(self):
+        from timesheets.models import Timesheet
+
+        position = ['2024-03-05', '2024-03-06T09:00:00Z', 5]
+        after = TimesheetKeysetPagination()._after(Timesheet, position)
+        self.assertIn(('date__lte', date(2024, 3, 5)), after.children)
+        for paginator_class in (TimesheetKeysetPagination, DraftKeysetPagination):
+            # One direction throughout, so a single index scan serves the order
+            ordering = paginator_class.ordering
+            self.assertTrue(all(name.startswith('-') for name in ordering))
+
+    def test_cursor_values_of_the_wrong_type(self):
+        from rest_framework.request import Request
+        from timesheets.models import Timesheet
+
+        for values in ([[1], '2024-01-01T00:00:00Z', 1], ['2024-01-01', {'a': 1}, 1],
+                       ['2024-01-01', '2024-01-01T00:00:00Z', [1]], ['2024-01-01']):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            request = Request(APIRequestFactory().get('/', {'cursor': cursor}))
+            paginator = TimesheetKeysetPagination()
+            with self.subTest(values=values), self.assertRaises(NotFound):
+                paginator.paginate_queryset(Timesheet.objects.all(), request)
+
+
+@override_settings(THROTTLE_COST_CLASSES={
+    'heavy': {'per_user': 1, 'global': 2, 'lease_seconds': 60, 'retry_after': 7},
+})
+class CostClassThrottleTests(APITestCase):
+    wide_range = {'date_from': '2020-01-01', 'date_to': '2024-12-31'}
+
+    def setUp(self):
+        from accounts.models import User
+
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='throttle@example.com', password='secret'
+        )
+        self.user.staff = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+
+    def summary(self, **params):
+        return self.client.get('/api/timesheets/summary/', params)
+
+    def test_heavy_requests_are_capped_per_user_and_released(self):
+        held = acquire_slot(_slot_keys('heavy', f'user:{self.user.pk}', 1), 60)
+        response = self.summary(**self.wide_range)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '7')
+        # Light requests do not wait for heavy slots
+        self.assertEqual(self.summary().status_code, 200)
+
+        cache.delete(held[0])
+        self.assertEqual(self.summary(**self.wide_range).status_code, 200)
+        self.assertEqual(self.summary(**self.wide_range).status_code, 200)
+
+    def test_global_cap(self):
+        for _ in range(2):
+            acquire_slot(_slot_keys('heavy', 'global', 2), 60)
+        self.assertEqual(self.summary(**self.wide_range).status_code, 429)
+        # The user's own slot was given back when the global one was refused
+        user_keys = _slot_keys('heavy', f'user:{self.user.pk}', 1)
+        self.assertEqual(cache.get_many(user_keys), {})
+
+    def test_streamed_responses_hold_their_slot_until_sent(self):
+        response = self.client.get('/api/timesheets/export/')
+        self.assertEqual(self.client.get('/api/timesheets/export/').status_code, 429)
+        b''.join(response.streaming_content)
+        response.close()
+        self.assertEqual(self.client.get('/api/timesheets/export/').status_code, 200)
+
+    def test_unauthorized_requests_take_no_slot(self):
+        self.user.staff = False
+        self.user.save()
+        # Every slot is held, yet non-admins are told 403 rather than to retry
+        for _ in range(2):
+            acquire_slot(_slot_keys('heavy', 'global', 2), 60)
+        self.assertEqual(self.client.get('/api/timesheets/export/').status_code, 403)
+        with mock.patch('apiserver.throttling.acquire_slot') as acquire:
+            response = self.client.get('/api/timesheets/all/', self.wide_range)
+        self.assertEqual(response.status_code, 403)
+        acquire.assert_not_called()
+
+
+class AsyncMiddlewareTests(APITestCase):
+    def setUp(self):
+        from accounts.models import User
+        from accounts.tokens import UserRefreshToken
+
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='async@example.com', password='secret'
+        )
+        self.user.staff = True
+        self.user.save()
+        token = UserRefreshToken.for_user(self.user).access_token
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def test_middleware_stays_async_under_asgi(self):
+        async def get_response(request):
+            return None
+
+        for middleware in (ReplicaStickinessMiddleware, CostThrottleMiddleware):
+            self.assertTrue(iscoroutinefunction(middleware(get_response)))
+            self.assertFalse(iscoroutinefunction(middleware(lambda request: None)))
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    async def test_async_view_writes_keep_the_user_on_the_primary(self):
+        await cache.aset(_lag_key('replica'), float('inf'))
+        response = await self.async_client.get(
+            '/api/timesheets/user-info/', headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(await cache.aget(_sticky_key(self.user.pk)))
+
+        await self.async_client.post('/api/timesheets/user-info/', headers=self.headers)
+        self.assertTrue(await cache.aget(_sticky_key(self.user.pk)))
+
+    async def test_async_requests_release_their_slots(self):
+        params = {'date_from': '2020-01-01', 'date_to': '2024-12-31'}
+        for _ in range(2):
+            response = await self.async_client.get(
+                '/api/timesheets/summary/', params, headers=self.headers
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(await cache.aget_many(_slot_keys('heavy', 'global', 2)), {})
@@ -0,0 +1,162 @@
+"""
+Cap the number of expensive requests in flight, per user and across all workers.
+
+Views name a cost class with a `cost_class` attribute, or decide per request in
+`get_cost_class(request)`, e.g. from the date range asked for. Each class in
+THROTTLE_COST_CLASSES allows a number of concurrent requests per user and
+globally; a request over either cap is refused with 429 and Retry-After, so
+month-end reports cannot take every database connection. Views without a cost
+class are light and never touch the cache here.
+
+A slot is a cache key taken with an atomic add (SET NX on Redis) and given back
+when the response is finished, or once a streamed response has been sent. Slots
+expire after the class's lease_seconds, so a killed worker cannot leak them.
+"""
+import uuid
+from datetime import date
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+def _slot_keys(cost_class, scope, limit):
+    return [f"throttle:{cost_class}:{scope}:{slot}" for slot in range(limit)]
+
+
+def acquire_slot(keys, lease_seconds):
+    """Take a free slot among `keys`; returns (key, token) or None when all are held"""
+    held = cache.get_many(keys)
+    token = uuid.uuid4().hex
+    for key in keys:
+        if key not in held and cache.add(key, token, lease_seconds):
+            return key, token
+    return None
+
+
+def release_slot(key, token):
+    """Give a slot back, unless its lease ran out and another request now holds it"""
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def release_request_slots(request):
+    for key, token in getattr(request, "_cost_slots", ()):
+        release_slot(key, token)
+    request._cost_slots = []
+
+
+def cost_class_for_range(date_from, date_to, default=None):
+    """
+    "heavy" for date ranges longer than THROTTLE_HEAVY_RANGE_DAYS, `default` otherwise
+
+    Accepts dates or YYYY-MM-DD strings; unparseable dates give `default`, leaving
+    the view to reject them.
+    """
+    try:
+        start, end = (
+            value if isinstance(value, date) else date.fromisoformat(value)
+            for value in (date_from, date_to)
+        )
+    except (TypeError, ValueError):
+        return default
+    if (end - start).days > settings.THROTTLE_HEAVY_RANGE_DAYS:
+        return "heavy"
+    return default
+
+
+class CostClassThrottle(BaseThrottle):
+    """
+    Refuse a request when its cost class has no free slot for the user or globally
+
+    The slots taken are released by CostThrottleMiddleware.
+    """
+
+    def allow_request(self, request, view):
+        get_cost_class = getattr(view, "get_cost_class", None)
+        if get_cost_class:
+            cost_class = get_cost_class(request)
+        else:
+            cost_class = getattr(view, "cost_class", None)
+        limits = settings.THROTTLE_COST_CLASSES.get(cost_class)
+        if limits is None:
+            return True
+
+        self.retry_after = limits["retry_after"]
+        user = request.user
+        if user and user.is_authenticated:
+            scope = f"user:{user.pk}"
+        else:
+            scope = f"ip:{self.get_ident(request)}"
+        slots = []
+        for keys in (
+            _slot_keys(cost_class, scope, limits["per_user"]),
+            _slot_keys(cost_class, "global", limits["global"]),
+        ):
+            slot = acquire_slot(keys, limits["lease_seconds"])
+            if slot is None:
+                for key, token in slots:
+                    release_slot(key, token)
+                return False
+            slots.append(slot)
+
+        # On the Django request, where the middleware finds them
+        django_request = request._request
+        django_request._cost_slots = getattr(django_request, "_cost_slots", []) + slots
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class CostThrottleMiddleware:
+    """Release the cost class slots a request took once its response is done"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if getattr(request, "_cost_slots", None):
+            self.release_when_done(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if getattr(request, "_cost_slots", None):
+            await sync_to_async(self.release_when_done)(request, response)
+        return response
+
+    def release_when_done(self, request, response):
+        if not response.streaming:
+            release_request_slots(request)
+        elif response.is_async:
+            content = self._release_after_async(response.streaming_content, request)
+            response.streaming_content = content
+        else:
+            content = self._release_after(response.streaming_content, request)
+            response.streaming_content = content
+
+    @staticmethod
+    def _release_after(content, request):
+        # Reaches the finally clause when the stream ends or the response is closed
+        try:
+            yield from content
+        finally:
+            release_request_slots(request)
+
+    @staticmethod
+    async def _release_after_async(content, request):
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            await sync_to_async(release_request_slots)(request)
@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import Project
+from .models import Project, ProjectActivityType
+
+
+class ProjectActivityTypeInline(admin.TabularInline):
+    model = ProjectActivityType
+    fields = ['name', 'position']
+    extra = 1
+
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
@@ -12,14 +19,11 @@ class ProjectAdmin(admin.ModelAdmin):
         ('Basic Information', {
             'fields': ('name', 'billable', 'status')
         }),
-        ('Activity Types', {
-            'fields': ('activity_types',),
-            'description': 'JSON array of activity types (e.g., ["Development", "Testing", "Design"])'
-        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
     
+    inlines = [ProjectActivityTypeInline]
     readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
@@ -0,0 +1,83 @@
+# Generated by Django 5.0.2 on 2026-10-16 22:33
+
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_activity_types(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    ProjectActivityType = apps.get_model("projects", "ProjectActivityType")
+
+    entries = []
+    for project in Project.objects.exclude(activity_types__isnull=True).iterator():
+        try:
+            names = json.loads(project.activity_types or "[]")
+        except json.JSONDecodeError:
+            names = []
+        if not isinstance(names, list):
+            names = []
+        # Drop duplicates but keep the original order
+        for position, name in enumerate(dict.fromkeys(str(n) for n in names)):
+            entries.append(
+                ProjectActivityType(project=project, name=name, position=position)
+            )
+    ProjectActivityType.objects.bulk_create(entries, batch_size=1000)
+
+
+def restore_activity_types(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    ProjectActivityType = apps.get_model("projects", "ProjectActivityType")
+
+    names_by_project = {}
+    for entry in ProjectActivityType.objects.order_by("position", "id"):
+        names_by_project.setdefault(entry.project_id, []).append(entry.name)
+    for project_id, names in names_by_project.items():
+        Project.objects.filter(id=project_id).update(activity_types=json.dumps(names))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectActivityType",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("position", models.PositiveIntegerField(default=0)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_type_entries",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["position", "id"],
+                "indexes": [
+                    models.Index(fields=["name"], name="projects_pr_name_7dc0f1_idx")
+                ],
+                "unique_together": {("project", "name")},
+            },
+        ),
+        migrations.RunPython(copy_activity_types, restore_activity_types),
+        migrations.RemoveField(
+            model_name="project",
+            name="activity_types",
+        ),
+    ]
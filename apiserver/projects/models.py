@@ -1,5 +1,6 @@
-from django.db import models
-import json
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models.functions import Upper
 
 class Project(models.Model):
     STATUS_CHOICES = [
@@ -12,32 +13,86 @@ class Project(models.Model):
     name = models.CharField(max_length=200)
     billable = models.BooleanField(default=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
-    activity_types = models.TextField(
-        help_text='JSON array of activity types specific to this project',
-        blank=True,
-        null=True
-    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Serves name__icontains searches
+            GinIndex(
+                OpClass(Upper('name'), name='gin_trgm_ops'),
+                name='project_name_trgm',
+            ),
+        ]
         
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the name as loaded so a rename can be pushed to the timesheets
+        loaded = dict(zip(field_names, values, strict=True))
+        if 'name' in loaded:
+            instance._loaded_name = loaded['name']
+        return instance
+
+    def save(self, *args, **kwargs):
+        renamed = getattr(self, '_loaded_name', self.name) != self.name
+        super().save(*args, **kwargs)
+        if renamed:
+            from timesheets.tasks import propagate_project_name
+            project_id = self.pk
+            # Robust: a broker outage must not fail the save, sweep_stale_names
+            # catches up on renames whose task was never queued
+            transaction.on_commit(
+                lambda: propagate_project_name.delay(project_id), robust=True
+            )
+        self._loaded_name = self.name
     
     def get_activity_types(self):
         """Return activity types as a Python list"""
-        if self.activity_types:
-            try:
-                return json.loads(self.activity_types)
-            except json.JSONDecodeError:
-                return []
-        return []
+        # Uses prefetch_related('activity_type_entries') when present, else one query
+        if not hasattr(self, '_activity_types'):
+            entries = self.activity_type_entries.all()
+            self._activity_types = [entry.name for entry in entries]
+        return list(self._activity_types)
+
+    def activity_type_set(self):
+        """Return activity types as a set for membership checks"""
+        if not hasattr(self, '_activity_type_set'):
+            self._activity_type_set = frozenset(self.get_activity_types())
+        return self._activity_type_set
     
     def set_activity_types(self, activity_list):
-        """Set activity types from a Python list"""
-        if activity_list:
-            self.activity_types = json.dumps(activity_list)
-        else:
-            self.activity_types = None
\ No newline at end of file
+        """Replace activity types from a Python list (the project must be saved)"""
+        names = list(dict.fromkeys(activity_list or []))
+        self.activity_type_entries.all().delete()
+        ProjectActivityType.objects.bulk_create([
+            ProjectActivityType(project=self, name=name, position=position)
+            for position, name in enumerate(names)
+        ])
+        self._activity_types = names
+        self.__dict__.pop('_activity_type_set', None)
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        prefetched.pop('activity_type_entries', None)
+
+
+class ProjectActivityType(models.Model):
+    """One activity type allowed on a project, kept in display order"""
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='activity_type_entries'
+    )
+    name = models.CharField(max_length=100)
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['position', 'id']
+        unique_together = ['project', 'name']
+        indexes = [
+            models.Index(fields=['name']),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} - {self.name}"
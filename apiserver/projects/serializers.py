@@ -1,3 +1,4 @@
+import json
 from rest_framework import serializers
 from .models import Project
 
@@ -8,6 +9,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         required=False,
         help_text="List of activity types for this project"
     )
+    activity_types = serializers.SerializerMethodField(read_only=True)
     activity_types_display = serializers.SerializerMethodField(read_only=True)
     
     class Meta:
@@ -19,6 +21,11 @@ class ProjectSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'activity_types', 'activity_types_display']
     
+    def get_activity_types(self, obj):
+        """Return activity types as the JSON text clients have always received"""
+        activity_types = obj.get_activity_types()
+        return json.dumps(activity_types) if activity_types else None
+
     def get_activity_types_display(self, obj):
         """Return activity types as a list for display"""
         return obj.get_activity_types()
@@ -26,9 +33,7 @@ class ProjectSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         activity_types_list = validated_data.pop('activity_types_list', [])
         project = Project.objects.create(**validated_data)
-        if activity_types_list:
-            project.set_activity_types(activity_types_list)
-            project.save()
+        project.set_activity_types(activity_types_list)
         return project
     
     def update(self, instance, validated_data):
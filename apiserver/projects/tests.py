@@ -0,0 +1,110 @@
+import json
+from importlib import import_module
+
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TransactionTestCase
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from apiserver.testing import QueryBudgetMixin
+from .models import Project
+
+ACTIVITIES = ['Development', 'Review', 'Testing']
+
+
+class ProjectQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    urlconf = 'projects.urls'
+    query_budgets = {
+        'project-list-create': {'get': 3, 'post': 3},
+        'project-detail': {'get': 2, 'patch': 7, 'delete': 8},
+        'project-choices': {'get': 0},
+        'active-projects': {'get': 1},
+    }
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='budget@example.com', password='secret'
+        )
+        self.client.force_authenticate(self.user)
+
+    def seed(self, rows):
+        """`rows` active projects, each with a few activity types"""
+        projects = Project.objects.bulk_create(
+            Project(name=f'Project {index}') for index in range(rows)
+        )
+        for project in projects:
+            project.set_activity_types(ACTIVITIES)
+        return {'projects': projects}
+
+    def build_request(self, name, label, context):
+        project = context['projects'][0]
+        if name == 'project-list-create' and label == 'post':
+            return {}, {'name': 'New project', 'activity_types_list': ACTIVITIES}
+        if name == 'project-detail':
+            if label == 'patch':
+                return {'pk': project.id}, {
+                    'name': 'Renamed', 'activity_types_list': ACTIVITIES[:2]
+                }
+            return {'pk': project.id}, {}
+        return {}, {}
+
+
+class ActivityTypeMigrationTests(TransactionTestCase):
+    """copy_activity_types, run against the models as they were before 0002"""
+    migration = import_module('projects.migrations.0002_projectactivitytype')
+
+    def setUp(self):
+        loader = MigrationLoader(connection)
+        state = loader.project_state(('projects', '0001_initial'))
+        # The state half way through 0002: both the JSON column and the new table
+        self.migration.Migration.operations[0].state_forwards('projects', state)
+        self.apps = state.apps
+        project = self.apps.get_model('projects', 'Project')
+        self.column = project._meta.get_field('activity_types')
+        with connection.schema_editor() as editor:
+            editor.add_field(project, self.column)
+
+    def tearDown(self):
+        project = self.apps.get_model('projects', 'Project')
+        with connection.schema_editor() as editor:
+            editor.remove_field(project, self.column)
+
+    def migrate(self, **activity_types):
+        """Names copied for each project, keyed like `activity_types`"""
+        Project = self.apps.get_model('projects', 'Project')
+        ids = {
+            key: Project.objects.create(name=key, activity_types=value).id
+            for key, value in activity_types.items()
+        }
+        with connection.schema_editor() as editor:
+            self.migration.copy_activity_types(self.apps, editor)
+        entries = self.apps.get_model('projects', 'ProjectActivityType').objects
+        return {
+            key: list(
+                entries.filter(project_id=pk)
+                .order_by('position')
+                .values_list('name', 'position')
+            )
+            for key, pk in ids.items()
+        }
+
+    def test_order_is_kept(self):
+        copied = self.migrate(ordered=json.dumps(['Testing', 'Development', 'Review']))
+        self.assertEqual(
+            copied['ordered'], [('Testing', 0), ('Development', 1), ('Review', 2)]
+        )
+
+    def test_duplicate_names_keep_their_first_position(self):
+        names = ['Review', 'Development', 'Review', 'Testing', 'Development']
+        copied = self.migrate(duplicates=json.dumps(names))
+        self.assertEqual(
+            copied['duplicates'], [('Review', 0), ('Development', 1), ('Testing', 2)]
+        )
+
+    def test_empty_and_unreadable_lists_copy_nothing(self):
+        copied = self.migrate(
+            empty=json.dumps([]), blank='', missing=None,
+            broken='["Review"', not_a_list=json.dumps({'name': 'Review'}),
+        )
+        self.assertEqual(copied, dict.fromkeys(copied, []))
@@ -3,16 +3,20 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import transaction
+from django.utils.decorators import method_decorator
 from .models import Project
 from .serializers import ProjectSerializer, ProjectListSerializer
 from rest_framework import generics
 from rest_framework.views import APIView
+from apiserver.async_views import AsyncAPIView
+from apiserver.db_router import replica_reads
+from apiserver.pagination import ProjectKeysetPagination
 
 logger = logging.getLogger(__name__)
 
 class ProjectListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
-    queryset = Project.objects.all()
+    queryset = Project.objects.prefetch_related('activity_type_entries')
     serializer_class = ProjectSerializer
 
     def get_serializer_class(self):
@@ -20,8 +24,18 @@ class ProjectListCreateView(generics.ListCreateAPIView):
             return ProjectListSerializer
         return ProjectSerializer
 
+    @method_decorator(replica_reads)
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
+        if ProjectKeysetPagination.is_requested(request):
+            paginator = ProjectKeysetPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            return Response({
+                'count': queryset.count(),
+                'projects': self.get_serializer(page, many=True).data,
+                'pagination': paginator.get_pagination_info()
+            })
+
         serializer = self.get_serializer(queryset, many=True)
         return Response({
             'count': queryset.count(),
@@ -29,7 +43,7 @@ class ProjectListCreateView(generics.ListCreateAPIView):
         })
 
 class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Project.objects.all()
+    queryset = Project.objects.prefetch_related('activity_type_entries')
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]
 
@@ -75,6 +89,7 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
 class ProjectChoicesView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -82,12 +97,14 @@ class ProjectChoicesView(APIView):
         """Return available project status choices."""
         return Response({'statuses': dict(Project.STATUS_CHOICES)})
 
-class ActiveProjectsListView(generics.ListAPIView):
+
+class ActiveProjectsListView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    use_read_replica = True
 
     def get_queryset(self):
         return Project.objects.filter(status='active').values('id', 'name', 'billable')
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        return Response({'projects': list(queryset)})
\ No newline at end of file
+    async def get(self, request):
+        projects = [project async for project in self.get_queryset()]
+        return Response({'projects': projects})
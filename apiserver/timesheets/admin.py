@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.db.models import Sum
+from apiserver.pagination import EstimatedCountPaginator
 from .models import Timesheet
 
 @admin.register(Timesheet)
@@ -18,6 +19,10 @@ class TimesheetAdmin(admin.ModelAdmin):
     ]
     ordering = ['-date', '-created_at']
     date_hierarchy = 'date'
+
+    # Large changelists show planner estimates instead of counting the whole table
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     # Optimize queries
     list_select_related = ['user', 'project']
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apiserver.db_router import current_read_alias
+
+DASHBOARD_CACHE_TIMEOUT = 15 * 60
+DASHBOARD_KEY_PREFIX = 'timesheets:dashboard'
+
+
+def _month_starts(date_from, date_to):
+    """First day of every month overlapping the date range"""
+    month = date_from.replace(day=1)
+    while month <= date_to:
+        yield month
+        month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _version_key(month):
+    return f'{DASHBOARD_KEY_PREFIX}:version:{month:%Y-%m}'
+
+
+def normalize_dashboard_filters(filters, date_range):
+    """Canonical form of the admin filters so equivalent requests share a cache entry"""
+    normalized = {}
+    for name, value in filters.items():
+        value = value or ''
+        if name in ('activity_type', 'user_search', 'project_search'):
+            value = value.lower()  # icontains filters are case-insensitive
+        if value:
+            normalized[name] = value
+    normalized['date_from'] = date_range[0].isoformat()
+    normalized['date_to'] = date_range[1].isoformat()
+    return normalized
+
+
+def dashboard_cache_key(filters, date_range):
+    """
+    Cache key for the dashboard aggregates of a filter set
+
+    The key embeds the write version of every month in the range, so a write to
+    any of those months makes the old entry unreachable.
+    """
+    version_keys = [_version_key(month) for month in _month_starts(*date_range)]
+    versions = cache.get_many(version_keys)
+    payload = {
+        'filters': normalize_dashboard_filters(filters, date_range),
+        'versions': [versions.get(key, 0) for key in version_keys],
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode()
+    digest = hashlib.sha1(encoded).hexdigest()  # noqa: S324
+    return f'{DASHBOARD_KEY_PREFIX}:{digest}'
+
+
+def get_or_build_dashboard(filters, date_range, build):
+    """
+    Return cached dashboard aggregates for the filters, building them on a miss
+
+    Args:
+        filters: dict of raw admin filter values
+        date_range: (date_from, date_to) tuple of dates
+        build: callable returning the aggregates to cache
+    """
+    # The versions go into the key before `build` reads anything
+    key = dashboard_cache_key(filters, date_range)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, dashboard_cache_timeout())
+    return data
+
+
+def dashboard_cache_timeout():
+    """
+    Seconds built aggregates stay cached
+
+    A replica may not have replayed a write that already bumped the version in
+    the key, so aggregates read from one expire within REPLICA_MAX_LAG_SECONDS.
+    """
+    if current_read_alias() is None:
+        return DASHBOARD_CACHE_TIMEOUT
+    return min(DASHBOARD_CACHE_TIMEOUT, settings.REPLICA_MAX_LAG_SECONDS)
+
+
+def invalidate_dashboard(dates):
+    """
+    Bump the dashboard version of every month touched by a write
+
+    Runs after the surrounding transaction commits so a concurrent reader cannot
+    cache pre-commit numbers under the new version.
+    """
+    months = {day.replace(day=1) for day in dates if day}
+    if not months:
+        return
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({_version_key(month): version for month in months}, None)
+
+    transaction.on_commit(bump)
+
+
+def _user_write_key(user_id):
+    return f'timesheets:user-write:{user_id}'
+
+
+def user_write_stamp(user_id):
+    """
+    Epoch time of the user's last timesheet write
+
+    A missing stamp (never written, or evicted) is reset to now, so a lost stamp can
+    only ever make clients refetch, never serve them stale data.
+    """
+    key = _user_write_key(user_id)
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, time.time(), None)
+        stamp = cache.get(key)
+    return stamp
+
+
+def touch_user_timesheets(user_ids):
+    """Record a timesheet write for each user once the transaction commits"""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+
+    def touch():
+        stamp = time.time()
+        cache.set_many({_user_write_key(user_id): stamp for user_id in user_ids}, None)
+
+    transaction.on_commit(touch)
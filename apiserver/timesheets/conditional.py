@@ -0,0 +1,94 @@
+import hashlib
+import time
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import user_write_stamp
+
+
+def timesheet_validators(user_id, timesheets, **extra_aggregates):
+    """
+    Cheap (etag, last_modified) validators for a set of timesheets
+
+    Built from one aggregate over the rows (latest updated_at and row count) plus the
+    user's write stamp, which also moves on deletes. Extra aggregates, e.g. the
+    project's updated_at, are folded into the ETag.
+
+    Returns:
+        tuple: (etag, last_modified epoch seconds), or None when the set is empty
+            and `extra_aggregates` were requested (nothing to validate against)
+    """
+    stats = timesheets.order_by().aggregate(**_validator_aggregates(extra_aggregates))
+    return _build_validators(stats, extra_aggregates, lambda: user_write_stamp(user_id))
+
+
+async def atimesheet_validators(user_id, timesheets, **extra_aggregates):
+    """Async timesheet_validators"""
+    stats = await timesheets.order_by().aaggregate(
+        **_validator_aggregates(extra_aggregates)
+    )
+    # Awaited in turn: both run on the one thread-sensitive sync worker anyway
+    stamp = await sync_to_async(user_write_stamp)(user_id)
+    return _build_validators(stats, extra_aggregates, lambda: stamp)
+
+
+def _validator_aggregates(extra_aggregates):
+    return {
+        'latest_update': Max('updated_at'),
+        'row_count': Count('id'),
+        **extra_aggregates,
+    }
+
+
+def _build_validators(stats, extra_aggregates, get_stamp):
+    if extra_aggregates and not stats['row_count']:
+        return None
+
+    stamp = get_stamp()
+    modified = [stamp] + [
+        value.timestamp() for value in stats.values() if isinstance(value, datetime)
+    ]
+    source = ':'.join(str(stats[name]) for name in sorted(stats)) + f':{stamp}'
+    etag = quote_etag(hashlib.sha1(source.encode()).hexdigest())  # noqa: S324
+    return etag, max(modified)
+
+
+def _settled_last_modified(last_modified):
+    """
+    Last-Modified in whole seconds, or None while that second is still running
+
+    HTTP dates have one-second resolution: a date sent during the second of the
+    last write would still match after another write in the same second. Until
+    the second is over only the ETag validates.
+    """
+    if int(last_modified) < int(time.time()):
+        return int(last_modified)
+    return None
+
+
+def not_modified_response(request, validators):
+    """304 response when the request's If-None-Match / If-Modified-Since still match"""
+    if validators is None:
+        return None
+    etag, last_modified = validators
+    response = get_conditional_response(
+        request, etag=etag, last_modified=_settled_last_modified(last_modified)
+    )
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators):
+    """Attach ETag and, once it is settled, Last-Modified headers to a response"""
+    if validators is not None:
+        etag, last_modified = validators
+        response['ETag'] = etag
+        last_modified = _settled_last_modified(last_modified)
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
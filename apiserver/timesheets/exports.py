@@ -0,0 +1,76 @@
+import csv
+import json
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (header, queryset field) pairs in output order
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('date', 'date'),
+    ('user_email', 'user__email'),
+    ('user_name', 'user_name'),
+    ('project_name', 'project_name'),
+    ('activity_type', 'activity_type'),
+    ('hours_worked', 'hours_worked'),
+    ('status', 'status'),
+    ('description', 'description'),
+    ('created_at', 'created_at'),
+    ('submitted_at', 'submitted_at'),
+]
+EXPORT_HEADERS = [header for header, _ in EXPORT_COLUMNS]
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_rows(timesheets, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield plain export rows for a Timesheet queryset without building model instances
+
+    Uses a server-side cursor so memory stays flat whatever the row count.
+    """
+    rows = timesheets.order_by('date', 'id').values_list(
+        *(field for _, field in EXPORT_COLUMNS)
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield [_export_value(value) for value in row]
+
+
+def _export_value(value):
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, int | str):
+        return value
+    return str(value)  # Decimal hours keep their two places, as in the API
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """Encode export rows as CSV lines, header first"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_HEADERS)
+    for row in rows:
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def ndjson_lines(rows):
+    """Encode export rows as one JSON object per line"""
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_HEADERS, row, strict=True))) + '\n'
+
+
+def export_lines(timesheets, export_format):
+    """Encoded output lines for a queryset in the given format ('csv' or 'ndjson')"""
+    rows = export_rows(timesheets)
+    if export_format == 'ndjson':
+        return ndjson_lines(rows)
+    return csv_lines(rows)
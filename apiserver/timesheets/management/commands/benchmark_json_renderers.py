@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User
+from apiserver.renderers import ORJSONRenderer
+from timesheets.models import Timesheet
+from timesheets.serializers import TimesheetListSerializer, WeekSummarySerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the orjson renderer with DRF's JSONRenderer on payloads built from "
+        "the timesheets in the database, checking that both produce the same bytes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=500, help="Timesheets in the list payload"
+        )
+        parser.add_argument(
+            "--weeks",
+            type=int,
+            default=50,
+            help="Week summaries to render, one per user",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Renders per payload; the best run is reported",
+        )
+
+    def handle(self, *args, **options):
+        if min(options["rows"], options["weeks"], options["repeat"]) < 1:
+            raise CommandError("--rows, --weeks and --repeat must be positive")
+
+        rows, weeks = options["rows"], options["weeks"]
+        payloads = {
+            f"timesheet list ({rows} rows)": self.list_payload(rows),
+            f"week summaries ({weeks} weeks)": self.week_summaries(weeks),
+        }
+        if not payloads[next(iter(payloads))]["results"]:
+            raise CommandError(
+                "No timesheets to render; load some with seed_scale first"
+            )
+
+        baseline, candidate = JSONRenderer(), ORJSONRenderer()
+        self.stdout.write(
+            f"{'payload':<34} {'size':>10} {'JSONRenderer':>14} "
+            f"{'ORJSONRenderer':>16} {'speedup':>8}"
+        )
+        for name, payload in payloads.items():
+            expected = baseline.render(payload)
+            if candidate.render(payload) != expected:
+                raise CommandError(f"The renderers disagree on the {name} payload")
+
+            before = self.best_time(baseline, payload, options["repeat"])
+            after = self.best_time(candidate, payload, options["repeat"])
+            self.stdout.write(
+                f"{name:<34} {len(expected) / 1024:>7.0f} kB {before * 1000:>11.2f} ms "
+                f"{after * 1000:>13.2f} ms {before / after:>7.1f}x"
+            )
+
+    def best_time(self, renderer, payload, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            renderer.render(payload)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def list_payload(self, rows):
+        """A page of the timesheet list as the list endpoint returns it"""
+        timesheets = Timesheet.objects.select_related("user").order_by(
+            "-date", "-created_at"
+        )[:rows]
+        results = TimesheetListSerializer(timesheets, many=True).data
+        return {"next": None, "previous": None, "results": results}
+
+    def week_summaries(self, weeks):
+        """The latest week summary of the users who logged time most recently"""
+        latest = list(
+            Timesheet.objects.values("user")
+            .annotate(last_date=Max("date"))
+            .order_by("-last_date")[:weeks]
+        )
+        users = User.objects.in_bulk([row["user"] for row in latest])
+        summaries = []
+        for row in latest:
+            user = users[row["user"]]
+            week_start = row["last_date"] - timedelta(days=row["last_date"].weekday())
+            serializer = WeekSummarySerializer(
+                data={"week_start": week_start.isoformat()},
+                context={"request": SimpleNamespace(user=user)},
+            )
+            serializer.is_valid(raise_exception=True)
+            summaries.append(serializer.data)
+        return summaries
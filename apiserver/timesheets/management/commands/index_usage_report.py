@@ -0,0 +1,174 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# One row per index of an ordinary or partitioned table. Partition indexes are
+# folded into the parent index they belong to, so each logical index is reported
+# once with the scans and size of all its partitions.
+INDEX_STATS_SQL = """
+SELECT t.relname,
+       i.relname,
+       am.amname,
+       ix.indisunique,
+       ix.indisprimary,
+       (string_to_array(ix.indkey::text, ' ')::int[])[1:ix.indnkeyatts],
+       string_to_array(ix.indkey::text, ' ')::int[],
+       pg_get_expr(ix.indpred, ix.indrelid),
+       pg_get_indexdef(i.oid),
+       COALESCE(s.idx_scan, 0) + COALESCE(parts.scans, 0),
+       COALESCE(s.idx_tup_read, 0) + COALESCE(parts.tuples_read, 0),
+       pg_relation_size(i.oid) + COALESCE(parts.size, 0)
+FROM pg_index ix
+JOIN pg_class i ON i.oid = ix.indexrelid
+JOIN pg_class t ON t.oid = ix.indrelid
+JOIN pg_am am ON am.oid = i.relam
+LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = i.oid
+LEFT JOIN LATERAL (
+    SELECT SUM(ps.idx_scan) AS scans,
+           SUM(ps.idx_tup_read) AS tuples_read,
+           SUM(pg_relation_size(inh.inhrelid)) AS size
+    FROM pg_inherits inh
+    LEFT JOIN pg_stat_user_indexes ps ON ps.indexrelid = inh.inhrelid
+    WHERE inh.inhparent = i.oid
+) parts ON true
+WHERE t.relnamespace = current_schema()::regnamespace
+  AND t.relkind IN ('r', 'p')
+  AND NOT t.relispartition
+  AND (cardinality(%(tables)s::text[]) = 0 OR t.relname = ANY(%(tables)s::text[]))
+ORDER BY t.relname, i.relname
+"""
+
+
+def _size(num_bytes):
+    for unit in ("B", "kB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def find_redundant(indexes):
+    """
+    Map index name -> name of an index that makes it redundant
+
+    A btree index is redundant when its key columns are a leading prefix of another
+    btree index on the same table with the same predicate that also holds all its
+    INCLUDE columns, so index-only scans are not lost. Unique and primary key
+    indexes enforce constraints and are never reported; expression indexes are
+    skipped because their key columns are not plain columns.
+    """
+    redundant = {}
+    for index in indexes:
+        keys = index["keys"]
+        if (
+            index["method"] != "btree"
+            or index["unique"]
+            or index["primary"]
+            or not keys
+            or 0 in keys
+        ):
+            continue
+        for other in indexes:
+            if (
+                other is index
+                or other["table"] != index["table"]
+                or other["method"] != "btree"
+                or other["predicate"] != index["predicate"]
+                or other["keys"][: len(keys)] != keys
+                or not set(index["columns"]) <= set(other["columns"])
+            ):
+                continue
+            # Of two identical indexes only the second one alphabetically is reported
+            same_columns = set(other["columns"]) == set(index["columns"])
+            identical = other["keys"] == keys and same_columns
+            constraint = other["unique"] or other["primary"]
+            if identical and not constraint and other["name"] > index["name"]:
+                continue
+            redundant[index["name"]] = other["name"]
+            break
+    return redundant
+
+
+class Command(BaseCommand):
+    help = (
+        "Report scans, size and redundancy of every index from the Postgres "
+        "statistics views, to find indexes that cost writes without serving reads "
+        "(PostgreSQL only)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table",
+            action="append",
+            default=[],
+            help="Only report indexes of this table; repeat for several tables",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError(
+                "index_usage_report reads the Postgres statistics views "
+                "and needs PostgreSQL"
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute(INDEX_STATS_SQL, {"tables": options["table"]})
+            columns = [
+                "table", "name", "method", "unique", "primary", "keys", "columns",
+                "predicate", "definition", "scans", "tuples_read", "size",
+            ]
+            indexes = [
+                dict(zip(columns, row, strict=True)) for row in cursor.fetchall()
+            ]
+            cursor.execute(
+                "SELECT stats_reset FROM pg_stat_database "
+                "WHERE datname = current_database()"
+            )
+            stats_reset = cursor.fetchone()[0]
+
+        if not indexes:
+            self.stdout.write("No indexes found")
+            return
+
+        since = stats_reset or "the database was created"
+        self.stdout.write(f"Index statistics collected since {since}")
+        redundant = find_redundant(indexes)
+        table = None
+        for index in indexes:
+            if index["table"] != table:
+                table = index["table"]
+                self.stdout.write(f"\n{table}")
+                self.stdout.write(
+                    f"  {'index':<40} {'scans':>12} {'tuples read':>14} {'size':>10}"
+                    "  notes"
+                )
+
+            notes = []
+            if index["primary"]:
+                notes.append("primary key")
+            elif index["unique"]:
+                notes.append("unique")
+            elif not index["scans"]:
+                notes.append(self.style.WARNING("unused"))
+            if index["name"] in redundant:
+                covering = redundant[index["name"]]
+                notes.append(self.style.WARNING(f"redundant with {covering}"))
+            if index["predicate"]:
+                notes.append(f"where {index['predicate']}")
+
+            self.stdout.write(
+                f"  {index['name']:<40} {index['scans']:>12} "
+                f"{index['tuples_read']:>14} {_size(index['size']):>10}  "
+                f"{', '.join(notes)}"
+            )
+            if options["verbosity"] > 1:
+                self.stdout.write(f"    {index['definition']}")
+
+        wasted = sum(
+            index["size"]
+            for index in indexes
+            if index["name"] in redundant
+            or not (index["scans"] or index["unique"] or index["primary"])
+        )
+        self.stdout.write(
+            f"\n{len(indexes)} indexes; unused or redundant ones take {_size(wasted)}"
+        )
@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from timesheets.models import Timesheet, TimesheetDailyRollup
+from timesheets.rollups import ROLLUP_KEY_FIELDS, build_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild or verify the timesheet daily rollup table, a chunk of users at a time"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report rollup rows that differ from the raw timesheets",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=200,
+            help="Number of users processed per transaction",
+        )
+
+    def handle(self, *args, **options):
+        verify = options["verify"]
+        chunk_size = options["chunk_size"]
+
+        user_ids = sorted(
+            set(
+                Timesheet.objects.order_by()
+                .values_list("user_id", flat=True)
+                .distinct()
+            )
+            | set(
+                TimesheetDailyRollup.objects.order_by()
+                .values_list("user_id", flat=True)
+                .distinct()
+            )
+        )
+
+        mismatches = 0
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            expected = build_rollups(Timesheet.objects.filter(user_id__in=chunk))
+
+            if verify:
+                mismatches += self._verify_chunk(chunk, expected)
+                continue
+
+            with transaction.atomic():
+                TimesheetDailyRollup.objects.filter(user_id__in=chunk).delete()
+                TimesheetDailyRollup.objects.bulk_create(expected, batch_size=1000)
+            self.stdout.write(
+                f"Rebuilt {len(expected)} rollup rows for {len(chunk)} users"
+            )
+
+        if verify:
+            if mismatches:
+                self.stdout.write(
+                    self.style.ERROR(f"{mismatches} rollup rows are out of sync")
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS("Rollups are in sync"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Rollup rebuild complete"))
+
+    def _verify_chunk(self, chunk, expected):
+        """Compare expected rollups with stored ones and print every difference"""
+
+        def key(row):
+            return tuple(getattr(row, field) for field in ROLLUP_KEY_FIELDS)
+
+        expected_by_key = {
+            key(row): (row.total_hours, row.entry_count) for row in expected
+        }
+        stored_by_key = {
+            key(row): (row.total_hours, row.entry_count)
+            for row in TimesheetDailyRollup.objects.filter(user_id__in=chunk)
+        }
+
+        mismatches = 0
+        for rollup_key in expected_by_key.keys() | stored_by_key.keys():
+            if expected_by_key.get(rollup_key) != stored_by_key.get(rollup_key):
+                mismatches += 1
+                expected = expected_by_key.get(rollup_key)
+                stored = stored_by_key.get(rollup_key)
+                self.stdout.write(
+                    f"Mismatch {rollup_key}: expected {expected}, stored {stored}"
+                )
+        return mismatches
@@ -0,0 +1,317 @@
+import random
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from psycopg2 import sql
+
+from accounts.models import User
+from projects.models import Project, ProjectActivityType
+from timesheets.models import Timesheet
+from timesheets.partitioning import (
+    add_months,
+    create_month_partition,
+    is_partitioned,
+    list_partitions,
+)
+
+FIRST_NAMES = [
+    "Aarav", "Priya", "Rahul", "Ananya", "Vikram",
+    "Meera", "Arjun", "Kavya", "Rohan", "Isha",
+]
+LAST_NAMES = [
+    "Sharma", "Iyer", "Patel", "Reddy", "Nair", "Gupta", "Menon", "Rao", "Das", "Joshi",
+]
+ACTIVITY_TYPES = [
+    "Development", "Code Review", "Testing", "Design", "Meetings",
+    "Documentation", "Deployment", "Support", "Research", "Planning",
+]
+PROJECT_STATUS_WEIGHTS = [
+    ("active", 80), ("completed", 10), ("on_hold", 7), ("cancelled", 3),
+]
+DESCRIPTIONS = [
+    None, "", "Sprint work", "Bug fixes", "Client call", "Follow-ups",
+    "Pairing session",
+]
+
+# Columns loaded per model, in row tuple order
+USER_FIELDS = [
+    "password",
+    "email",
+    "first_name",
+    "last_name",
+    "designation",
+    "company",
+    "active",
+    "staff",
+    "admin",
+    "auth_version",
+]
+PROJECT_FIELDS = ["name", "billable", "status", "created_at", "updated_at"]
+ACTIVITY_FIELDS = ["project", "name", "position"]
+TIMESHEET_FIELDS = [
+    "user", "project", "activity_type", "date", "hours_worked", "description", "status",
+    "user_name", "project_name", "created_at", "updated_at", "submitted_at",
+]
+
+
+def _copy_value(value):
+    """Render one value in COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    text = value.isoformat() if hasattr(value, "isoformat") else str(value)
+    return (text.replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def working_days(end_date, count):
+    """The last `count` weekdays up to end_date, oldest first"""
+    days, day = [], end_date
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+class _CopyStream:
+    """File-like object that renders rows for COPY FROM STDIN as they are read"""
+
+    def __init__(self, rows):
+        self._lines = ("\t".join(map(_copy_value, row)) + "\n" for row in rows)
+        self._buffer = ""
+        self.row_count = 0
+
+    def read(self, size=-1):
+        parts, length = [self._buffer], len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+            self.row_count += 1
+        data = "".join(parts)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a deterministic synthetic dataset of users, projects and timesheets "
+        "with COPY, for benchmarks and reproducing production-scale behaviour "
+        "(PostgreSQL only)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Random seed; the same seed gives the same data",
+        )
+        parser.add_argument(
+            "--users", type=int, default=5000, help="Number of users to create"
+        )
+        parser.add_argument(
+            "--projects", type=int, default=300, help="Number of projects to create"
+        )
+        parser.add_argument(
+            "--timesheets",
+            type=int,
+            default=1_000_000,
+            help="Approximate number of timesheet rows to create",
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            default=None,
+            help="Last day with timesheets (YYYY-MM-DD, defaults to today)",
+        )
+        parser.add_argument(
+            "--draft-ratio",
+            type=float,
+            default=0.03,
+            help=(
+                "Share of entries before the current week still in draft; "
+                "the current week is always draft"
+            ),
+        )
+        parser.add_argument(
+            "--skip-rollups",
+            action="store_true",
+            help="Do not rebuild the daily rollup table afterwards",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("seed_scale loads data with COPY and needs PostgreSQL")
+        if min(options["users"], options["projects"], options["timesheets"]) < 1:
+            raise CommandError("--users, --projects and --timesheets must be positive")
+
+        self.seed = options["seed"]
+        # Reproducible, not security sensitive
+        self.rng = random.Random(self.seed)  # noqa: S311
+        self.email_prefix = f"seed{self.seed}-"
+        if User.objects.filter(email__startswith=self.email_prefix).exists():
+            raise CommandError(f"A dataset for seed {self.seed} already exists")
+
+        end_date = options["end_date"] or date.today()
+        per_user = -(-options["timesheets"] // options["users"])
+        # Two entries per working day on average, with slack for users who log fewer
+        days = working_days(end_date, per_user * 5 // 8 + 5)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            users = self.copy_users(cursor, options["users"])
+            projects = self.copy_projects(cursor, options["projects"])
+            self.ensure_partitions(cursor, days[0], end_date)
+            rows = self.timesheet_rows(
+                users, projects, options["timesheets"], days, options["draft_ratio"]
+            )
+            count = self.copy_rows(cursor, Timesheet, TIMESHEET_FIELDS, rows)
+            self.stdout.write(f"Copied {count} timesheets from {days[0]} to {end_date}")
+            cursor.execute(
+                sql.SQL("ANALYZE {}").format(sql.Identifier(Timesheet._meta.db_table))
+            )
+
+        if not options["skip_rollups"]:
+            call_command("rebuild_timesheet_rollups", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"Seeded dataset {self.seed}"))
+
+    def copy_rows(self, cursor, model, fields, rows):
+        """COPY row tuples in `fields` order into the table; returns the row count"""
+        meta = model._meta
+        statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(meta.db_table),
+            sql.SQL(", ").join(
+                sql.Identifier(meta.get_field(name).column) for name in fields
+            ),
+        )
+        stream = _CopyStream(rows)
+        cursor.copy_expert(statement, stream)
+        return stream.row_count
+
+    def copy_returning_ids(self, cursor, model, fields, rows):
+        """COPY rows and return their new ids in insertion order"""
+        table = sql.Identifier(model._meta.db_table)
+        cursor.execute(sql.SQL("LOCK TABLE {} IN EXCLUSIVE MODE").format(table))
+        cursor.execute(sql.SQL("SELECT COALESCE(MAX(id), 0) FROM {}").format(table))
+        last_id = cursor.fetchone()[0]
+        self.copy_rows(cursor, model, fields, rows)
+        cursor.execute(
+            sql.SQL("SELECT id FROM {} WHERE id > %s ORDER BY id").format(table),
+            [last_id],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def copy_users(self, cursor, count):
+        """Returns (id, full name) for every new user"""
+        # Hashed once; every seeded user logs in with "password"
+        password = make_password("password")
+        designations = [choice for choice, _ in User.DESIGNATION_CHOICES]
+        names, rows = [], []
+        for index in range(count):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            names.append(f"{first} {last}")
+            designation = self.rng.choices(designations, [50, 20, 12, 10, 5, 3])[0]
+            rows.append((
+                password, f"{self.email_prefix}user{index}@example.com", first, last,
+                designation, "Mobiux", self.rng.random() > 0.02,
+                designation in ("manager", "senior_manager", "director"), index == 0, 0,
+            ))
+        ids = self.copy_returning_ids(cursor, User, USER_FIELDS, rows)
+        self.stdout.write(f"Copied {len(ids)} users")
+        return list(zip(ids, names, strict=True))
+
+    def copy_projects(self, cursor, count):
+        """Returns (id, name, activity types) for every new project"""
+        now = datetime.now(timezone.utc)
+        statuses, weights = zip(*PROJECT_STATUS_WEIGHTS, strict=True)
+        rows, activity_lists = [], []
+        for index in range(count):
+            activities = self.rng.sample(ACTIVITY_TYPES, self.rng.randint(3, 7))
+            activity_lists.append(activities)
+            rows.append((
+                f"Seed {self.seed} project {index:04d}", self.rng.random() < 0.7,
+                self.rng.choices(statuses, weights=weights)[0], now, now,
+            ))
+        ids = self.copy_returning_ids(cursor, Project, PROJECT_FIELDS, rows)
+        self.copy_rows(cursor, ProjectActivityType, ACTIVITY_FIELDS, (
+            (project_id, name, position)
+            for project_id, activities in zip(ids, activity_lists, strict=True)
+            for position, name in enumerate(activities)
+        ))
+        self.stdout.write(f"Copied {len(ids)} projects")
+        names = [row[0] for row in rows]
+        return list(zip(ids, names, activity_lists, strict=True))
+
+    def timesheet_rows(self, users, projects, total, days, draft_ratio):
+        """
+        Generate timesheet rows, user by user, walking back from the last working day
+
+        Each user is assigned a handful of projects and logs 1-3 entries per working
+        day on distinct (project, activity) pairs, so (user, project, date,
+        activity_type) stays unique.
+        """
+        per_user, remainder = divmod(total, len(users))
+        week_start = days[-1] - timedelta(days=days[-1].weekday())
+        for index, (user_id, user_name) in enumerate(users):
+            pairs = [
+                (project, activity)
+                for project in self.rng.sample(
+                    projects, min(len(projects), self.rng.randint(2, 5))
+                )
+                for activity in project[2]
+            ]
+            remaining = per_user + (1 if index < remainder else 0)
+            for day in days[::-1]:
+                if remaining <= 0:
+                    break
+                wanted = self.rng.choices((1, 2, 3), (3, 4, 3))[0]
+                entries = self.rng.sample(pairs, min(len(pairs), remaining, wanted))
+                remaining -= len(entries)
+                hours = self._split_hours(len(entries))
+                draft = day >= week_start or self.rng.random() < draft_ratio
+                created_at = datetime.combine(
+                    day, time(17, self.rng.randrange(60)), timezone.utc
+                )
+                submitted_at = (
+                    None if draft
+                    else created_at + timedelta(days=self.rng.randint(0, 6))
+                )
+                for pair, entry_hours in zip(entries, hours, strict=True):
+                    (project_id, project_name, _), activity = pair
+                    yield (
+                        user_id, project_id, activity, day, entry_hours,
+                        self.rng.choice(DESCRIPTIONS),
+                        "draft" if draft else "submitted", user_name, project_name,
+                        created_at, submitted_at or created_at, submitted_at,
+                    )
+
+    def _split_hours(self, count):
+        """Split a 6-10 hour day into `count` quarter-hour entries"""
+        quarters = self.rng.randint(24, 40)
+        cuts = sorted(self.rng.sample(range(1, quarters), count - 1))
+        bounds = [0, *cuts, quarters]
+        return [
+            f"{(upper - lower) / 4:.2f}"
+            for lower, upper in zip(bounds, bounds[1:], strict=False)
+        ]
+
+    def ensure_partitions(self, cursor, first_date, end_date):
+        """Create missing monthly partitions so seeded rows avoid the default one"""
+        if not is_partitioned(cursor):
+            return
+        existing = {lower for _, lower, _ in list_partitions(cursor)}
+        month = first_date.replace(day=1)
+        while month <= end_date:
+            if month not in existing:
+                create_month_partition(cursor, month)
+            month = add_months(month, 1)
@@ -0,0 +1,92 @@
+# Generated by Django 5.0.2 on 2026-10-16 22:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    Timesheet = apps.get_model("timesheets", "Timesheet")
+    TimesheetDailyRollup = apps.get_model("timesheets", "TimesheetDailyRollup")
+
+    rows = (
+        Timesheet.objects.order_by()
+        .values("user_id", "project_id", "activity_type", "date", "status")
+        .annotate(total_hours=Sum("hours_worked"), entry_count=Count("id"))
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(TimesheetDailyRollup(**row))
+        if len(batch) >= 2000:
+            TimesheetDailyRollup.objects.bulk_create(batch)
+            batch = []
+    TimesheetDailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0001_initial"),
+        ("timesheets", "0002_fix_duplicate_activity_constraint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimesheetDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("activity_type", models.CharField(max_length=100)),
+                ("date", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("draft", "Draft"), ("submitted", "Submitted")],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "total_hours",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=9),
+                ),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="timesheet_rollups",
+                        to="projects.project",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="timesheet_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "date"], name="timesheets__user_id_6a22d5_idx"
+                    ),
+                    models.Index(fields=["date"], name="timesheets__date_c60905_idx"),
+                ],
+                "unique_together": {
+                    ("user", "project", "activity_type", "date", "status")
+                },
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.2 on 2026-10-16 22:35
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build the timesheet indexes without locking writes
+    atomic = False
+
+    dependencies = [
+        ("projects", "0003_trigram_indexes"),
+        ("timesheets", "0003_timesheetdailyrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="timesheet",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("activity_type"),
+                    name="gin_trgm_ops",
+                ),
+                name="timesheet_activity_trgm",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="timesheetdailyrollup",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("activity_type"),
+                    name="gin_trgm_ops",
+                ),
+                name="rollup_activity_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,145 @@
+import re
+from datetime import date
+
+from django.db import migrations
+
+# Frozen copy of the conversion as it stood when this migration was written, so
+# later changes to timesheets.partitioning cannot change what it does
+PARENT_TABLE = "timesheets_timesheet"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+MONTHS_AHEAD = 3
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _is_partitioned(cursor):
+    cursor.execute(
+        """
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+        """,
+        [PARENT_TABLE],
+    )
+    return cursor.fetchone() is not None
+
+
+def convert_to_partitioned(cursor):
+    """
+    Rebuild timesheets_timesheet as a table partitioned by month on `date`
+
+    Copies every row, then recreates the original indexes, unique and foreign key
+    constraints under their original names so later migrations still find them.
+    The primary key becomes (id, date), as unique constraints on a partitioned
+    table must include the partition key.
+    """
+    if _is_partitioned(cursor):
+        return
+
+    quote = cursor.db.ops.quote_name
+    parent, legacy = quote(PARENT_TABLE), quote(f"{PARENT_TABLE}_legacy")
+    cursor.execute(f"ALTER TABLE {parent} RENAME TO {legacy}")
+
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(indexrelid) FROM pg_index
+        WHERE indrelid = %s::regclass AND NOT indisprimary
+          AND indexrelid NOT IN (
+              SELECT conindid FROM pg_constraint WHERE conrelid = %s::regclass
+          )
+        """,
+        [f"{PARENT_TABLE}_legacy", f"{PARENT_TABLE}_legacy"],
+    )
+    index_defs = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('u', 'f')
+        """,
+        [f"{PARENT_TABLE}_legacy"],
+    )
+    constraint_defs = cursor.fetchall()
+
+    cursor.execute(
+        f"CREATE TABLE {parent} "
+        f"(LIKE {legacy} INCLUDING DEFAULTS INCLUDING IDENTITY) "
+        f"PARTITION BY RANGE (date)"
+    )
+    cursor.execute(
+        f"CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {parent} DEFAULT"
+    )
+
+    cursor.execute(f"SELECT MIN(date) FROM {legacy}")
+    first_date = cursor.fetchone()[0] or date.today()
+    month = _month_start(first_date)
+    last = _add_months(_month_start(date.today()), MONTHS_AHEAD)
+    while month <= last:
+        name = quote(f"{PARENT_TABLE}_p{month:%Y_%m}")
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {parent} FOR VALUES FROM (%s) TO (%s)",
+            [month, _add_months(month, 1)],
+        )
+        month = _add_months(month, 1)
+
+    cursor.execute(f"INSERT INTO {parent} OVERRIDING SYSTEM VALUE SELECT * FROM {legacy}")
+
+    # Keep the id sequence going: identity columns get a fresh sequence from LIKE,
+    # serial columns keep pointing at the legacy sequence, which must outlive its table
+    cursor.execute(
+        "SELECT attidentity FROM pg_attribute "
+        "WHERE attrelid = %s::regclass AND attname = 'id'",
+        [PARENT_TABLE],
+    )
+    if cursor.fetchone()[0]:
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {parent}), 0) + 1, false)",
+            [PARENT_TABLE],
+        )
+    else:
+        cursor.execute(
+            "SELECT pg_get_serial_sequence(%s, 'id')", [f"{PARENT_TABLE}_legacy"]
+        )
+        sequence = cursor.fetchone()[0]
+        if sequence:
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {parent}.id")
+
+    cursor.execute(f"DROP TABLE {legacy}")
+
+    cursor.execute(
+        f"ALTER TABLE {parent} "
+        f"ADD CONSTRAINT {quote(PARENT_TABLE + '_pkey')} PRIMARY KEY (id, date)"
+    )
+    for name, definition in constraint_defs:
+        cursor.execute(f"ALTER TABLE {parent} ADD CONSTRAINT {quote(name)} {definition}")
+    for definition in index_defs:
+        cursor.execute(re.sub(r" ON (ONLY )?\S+ USING ", f" ON {parent} USING ", definition))
+
+    cursor.execute(f"ANALYZE {parent}")
+
+
+def partition_timesheets(apps, schema_editor):
+    # Native range partitioning is Postgres-only
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        convert_to_partitioned(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("timesheets", "0004_trigram_indexes"),
+    ]
+
+    operations = [
+        # Irreversible: going back means copying every row into a plain table again
+        migrations.RunPython(partition_timesheets),
+    ]
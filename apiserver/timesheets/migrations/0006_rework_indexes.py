@@ -0,0 +1,100 @@
+# Generated by Django 5.0.2 on 2026-10-16 22:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0003_trigram_indexes"),
+        ("timesheets", "0005_partition_timesheets_by_month"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Plain (not CONCURRENTLY) operations: Postgres cannot build or drop indexes on a
+    # partitioned table concurrently. The new indexes are built before the ones they
+    # replace are dropped, so reads keep an index throughout.
+    operations = [
+        migrations.AddIndex(
+            model_name="timesheet",
+            index=models.Index(
+                fields=["user", "date"],
+                include=("hours_worked", "status"),
+                name="timesheet_user_date_cover",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timesheet",
+            index=models.Index(
+                condition=models.Q(("status", "draft")),
+                fields=["user", "date"],
+                name="timesheet_draft_user_date",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timesheetdailyrollup",
+            index=models.Index(
+                fields=["user", "date"],
+                include=(
+                    "project",
+                    "activity_type",
+                    "status",
+                    "total_hours",
+                    "entry_count",
+                ),
+                name="rollup_user_date_cover",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="timesheet",
+            name="timesheets__user_id_c8ea5e_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="timesheet",
+            name="timesheets__user_id_bf2ef5_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="timesheet",
+            name="timesheets__created_f5cc6d_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="timesheet",
+            name="timesheets__status_d1d005_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="timesheetdailyrollup",
+            name="timesheets__user_id_6a22d5_idx",
+        ),
+        migrations.AlterField(
+            model_name="timesheet",
+            name="project",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timesheets",
+                to="projects.project",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="timesheet",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timesheets",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="timesheetdailyrollup",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timesheet_rollups",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
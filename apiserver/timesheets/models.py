@@ -2,10 +2,39 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from datetime import date
+from decimal import Decimal
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Coalesce, Upper
 from django.utils import timezone
 from accounts.models import User
 from projects.models import Project
 
+
+class TimesheetQuerySet(models.QuerySet):
+    def with_daily_totals(self):
+        """Annotate each row with its user's total hours that day, in the same query"""
+        day_total = (
+            Timesheet.objects
+            .filter(user=models.OuterRef('user'), date=models.OuterRef('date'))
+            .order_by()
+            .values('user', 'date')
+            .annotate(total=models.Sum('hours_worked'))
+            .values('total')
+        )
+        return self.annotate(
+            daily_total_hours=Coalesce(models.Subquery(day_total), Decimal('0'))
+        )
+
+    def delete(self):
+        """Delete rows and refresh the daily rollups they contributed to"""
+        from .rollups import refresh_daily_rollups
+
+        keys = set(self.values_list('user_id', 'date'))
+        result = super().delete()
+        refresh_daily_rollups(keys)
+        return result
+
+
 class Timesheet(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -13,8 +42,13 @@ class Timesheet(models.Model):
     ]
     
     # Link to User instead of separate Employee model
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timesheets')
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='timesheets')
+    # FK lookups use the composite indexes below, which lead with these columns
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timesheets', db_index=False
+    )
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='timesheets', db_index=False
+    )
     activity_type = models.CharField(max_length=100)
     date = models.DateField()
     hours_worked = models.DecimalField(
@@ -35,6 +69,8 @@ class Timesheet(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     submitted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TimesheetQuerySet.as_manager()
     
     class Meta:
         ordering = ['-date', '-created_at']
@@ -42,18 +78,49 @@ class Timesheet(models.Model):
         # This prevents confusion between draft and submitted activities with same name
         unique_together = ['user', 'project', 'date', 'activity_type']
         
-        # Database indexes for performance
+        # Database indexes; `manage.py index_usage_report` shows how often each is used
         indexes = [
-            models.Index(fields=['user', 'date']),
+            # Per-user date ranges; daily totals and status counts come from the index
+            models.Index(
+                fields=['user', 'date'],
+                include=['hours_worked', 'status'],
+                name='timesheet_user_date_cover',
+            ),
+            # Week drafts and the drafts list; only the small draft share is indexed
+            models.Index(
+                fields=['user', 'date'],
+                condition=models.Q(status='draft'),
+                name='timesheet_draft_user_date',
+            ),
             models.Index(fields=['project', 'date']),
             models.Index(fields=['date']),
-            models.Index(fields=['user', 'project', 'date']),
-            models.Index(fields=['-created_at']),
-            models.Index(fields=['status']),
+            # Serves activity_type__icontains searches
+            GinIndex(
+                OpClass(Upper('activity_type'), name='gin_trgm_ops'),
+                name='timesheet_activity_trgm',
+            ),
         ]
     
     def __str__(self):
         return f"{self.user_name} - {self.project_name} - {self.date} ({self.status})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the rollup key as loaded so a moved row also refreshes its old day
+        loaded = dict(zip(field_names, values, strict=True))
+        if 'user_id' in loaded and 'date' in loaded:
+            instance._loaded_rollup_key = (loaded['user_id'], loaded['date'])
+        return instance
+
+    @property
+    def rollup_keys(self):
+        """(user_id, date) pairs whose daily rollups depend on this row"""
+        keys = {(self.user_id, self.date)}
+        loaded_key = getattr(self, '_loaded_rollup_key', None)
+        if loaded_key:
+            keys.add(loaded_key)
+        return keys
     
     def clean(self):
         """Model-level validation - only for submitted timesheets"""
@@ -64,11 +131,12 @@ class Timesheet(models.Model):
             
             # Validate activity type exists in project
             if self.project and self.activity_type:
-                project_activities = self.project.get_activity_types()
+                project_activities = self.project.activity_type_set()
                 if project_activities and self.activity_type not in project_activities:
+                    valid = ", ".join(self.project.get_activity_types())
                     raise ValidationError(
                         f'Activity type "{self.activity_type}" is not valid for project "{self.project.name}". '
-                        f'Valid activities: {", ".join(project_activities)}'
+                        f'Valid activities: {valid}'
                     )
             
             # Check if user is active
@@ -95,6 +163,18 @@ class Timesheet(models.Model):
             self.full_clean()
         
         super().save(*args, **kwargs)
+
+        from .rollups import refresh_daily_rollups
+        refresh_daily_rollups(self.rollup_keys)
+        self._loaded_rollup_key = (self.user_id, self.date)
+
+    def delete(self, *args, **kwargs):
+        from .rollups import refresh_daily_rollups
+
+        keys = self.rollup_keys
+        result = super().delete(*args, **kwargs)
+        refresh_daily_rollups(keys)
+        return result
     
     def submit(self):
         """Submit a draft timesheet"""
@@ -114,4 +194,43 @@ class Timesheet(models.Model):
         return Timesheet.objects.filter(
             user=self.user,
             date=self.date
-        ).aggregate(total=models.Sum('hours_worked'))['total'] or 0
\ No newline at end of file
+        ).aggregate(total=models.Sum('hours_worked'))['total'] or 0
+
+
+class TimesheetDailyRollup(models.Model):
+    """Timesheet hours pre-aggregated per user/project/activity/day/status"""
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timesheet_rollups', db_index=False
+    )
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='timesheet_rollups'
+    )
+    activity_type = models.CharField(max_length=100)
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=Timesheet.STATUS_CHOICES)
+    total_hours = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['user', 'project', 'activity_type', 'date', 'status']
+        indexes = [
+            # Covers the per-user summary queries, so they run as index-only scans
+            models.Index(
+                fields=['user', 'date'],
+                include=[
+                    'project', 'activity_type', 'status', 'total_hours', 'entry_count'
+                ],
+                name='rollup_user_date_cover',
+            ),
+            models.Index(fields=['date']),
+            GinIndex(
+                OpClass(Upper('activity_type'), name='gin_trgm_ops'),
+                name='rollup_activity_trgm',
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.user_id} - {self.project_id} - {self.activity_type} - {self.date} "
+            f"({self.status})"
+        )
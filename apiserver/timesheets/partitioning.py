@@ -0,0 +1,131 @@
+"""
+Monthly range partitioning of the timesheets_timesheet table on `date`.
+
+Postgres only. Each month lives in its own partition named
+timesheets_timesheet_pYYYY_MM, with a DEFAULT partition catching dates outside the
+managed range. Queries bounded on `date` are pruned to the matching partitions.
+The table is converted by migration 0005; its primary key is (id, date) because
+a partitioned table's unique constraints must include the partition key. The
+(user, project, date, activity_type) unique constraint already does, so it is
+still enforced table-wide.
+"""
+import re
+from datetime import date
+
+PARENT_TABLE = 'timesheets_timesheet'
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+_BOUND_RE = re.compile(r"FROM \('(?P<lower>[\d-]+)'\) TO \('(?P<upper>[\d-]+)'\)")
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{PARENT_TABLE}_p{month:%Y_%m}'
+
+
+def is_partitioned(cursor):
+    cursor.execute(
+        """
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+        """,
+        [PARENT_TABLE],
+    )
+    return cursor.fetchone() is not None
+
+
+def list_partitions(cursor):
+    """
+    Month partitions currently attached to the parent table
+
+    Returns:
+        list: (name, lower_bound, upper_bound) tuples ordered by lower bound;
+        the DEFAULT partition is not included
+    """
+    cursor.execute(
+        """
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits i
+        JOIN pg_class parent ON parent.oid = i.inhparent
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)
+        """,
+        [PARENT_TABLE],
+    )
+    partitions = []
+    for name, bound in cursor.fetchall():
+        match = _BOUND_RE.search(bound or '')
+        if match:
+            partitions.append((
+                name,
+                date.fromisoformat(match['lower']),
+                date.fromisoformat(match['upper']),
+            ))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_month_partition(cursor, month):
+    """
+    Create and attach the partition for one month
+
+    Rows for that month that landed in the DEFAULT partition are moved into the
+    new partition first, otherwise ATTACH would fail its range check.
+    """
+    quote = cursor.db.ops.quote_name
+    name, upper = partition_name(month), add_months(month, 1)
+    parent, partition = quote(PARENT_TABLE), quote(name)
+    cursor.execute(f'CREATE TABLE {partition} (LIKE {parent} INCLUDING DEFAULTS)')
+    # Only quoted identifiers are interpolated; the bounds are parameters
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} '  # noqa: S608
+        f'WHERE date >= %s AND date < %s RETURNING *) '
+        f'INSERT INTO {partition} SELECT * FROM moved',
+        [month, upper],
+    )
+    cursor.execute(
+        f'ALTER TABLE {parent} ATTACH PARTITION {partition} '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        [month, upper],
+    )
+    return name
+
+
+def ensure_future_partitions(cursor, months_ahead, today=None):
+    """Create any missing partitions from this month up to `months_ahead` months out"""
+    current = month_start(today or date.today())
+    existing = {lower for _, lower, _ in list_partitions(cursor)}
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            created.append(create_month_partition(cursor, month))
+    return created
+
+
+def detach_old_partitions(cursor, retain_months, today=None):
+    """
+    Detach partitions that end more than `retain_months` months ago
+
+    Detached tables are kept as standalone archives rather than dropped.
+
+    Returns:
+        list: (name, lower_bound, upper_bound) of every detached partition
+    """
+    quote = cursor.db.ops.quote_name
+    cutoff = add_months(month_start(today or date.today()), -retain_months)
+    detached = []
+    for name, lower, upper in list_partitions(cursor):
+        if upper <= cutoff:
+            cursor.execute(
+                f'ALTER TABLE {quote(PARENT_TABLE)} DETACH PARTITION {quote(name)}'
+            )
+            detached.append((name, lower, upper))
+    return detached
@@ -0,0 +1,71 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .cache import invalidate_dashboard, touch_user_timesheets
+
+ROLLUP_KEY_FIELDS = ['user_id', 'project_id', 'activity_type', 'date', 'status']
+
+
+def build_rollups(timesheets):
+    """
+    Aggregate a Timesheet queryset into unsaved TimesheetDailyRollup objects
+
+    Args:
+        timesheets: QuerySet of Timesheet rows to aggregate
+
+    Returns:
+        list: TimesheetDailyRollup instances, one per rollup key
+    """
+    from .models import TimesheetDailyRollup
+
+    rows = (
+        timesheets.order_by()
+        .values(*ROLLUP_KEY_FIELDS)
+        .annotate(total_hours=Sum('hours_worked'), entry_count=Count('id'))
+    )
+    return [TimesheetDailyRollup(**row) for row in rows]
+
+
+def _keys_filter(keys):
+    """Build a Q matching any of the (user_id, date) pairs, one IN clause per user"""
+    dates_by_user = defaultdict(set)
+    for user_id, day in keys:
+        dates_by_user[user_id].add(day)
+    return reduce(or_, (
+        Q(user_id=user_id, date__in=sorted(dates))
+        for user_id, dates in dates_by_user.items()
+    ))
+
+
+def refresh_daily_rollups(keys):
+    """
+    Recompute the rollup rows for the given (user_id, date) pairs from raw timesheets
+
+    A user's day holds only a handful of entries, so recomputing it is cheap and keeps
+    the rollup correct whatever mix of creates, edits, deletes and submissions happened.
+
+    Args:
+        keys: iterable of (user_id, date) tuples
+    """
+    from .models import Timesheet, TimesheetDailyRollup
+
+    keys = {key for key in keys if key[0] and key[1]}
+    if not keys:
+        return
+
+    key_filter = _keys_filter(keys)
+    with transaction.atomic():
+        TimesheetDailyRollup.objects.filter(key_filter).delete()
+        TimesheetDailyRollup.objects.bulk_create(
+            build_rollups(Timesheet.objects.filter(key_filter)),
+            update_conflicts=True,
+            unique_fields=['user', 'project', 'activity_type', 'date', 'status'],
+            update_fields=['total_hours', 'entry_count'],
+        )
+    # Every timesheet write funnels through here, so this is the one invalidation hook
+    invalidate_dashboard(day for _, day in keys)
+    touch_user_timesheets(user_id for user_id, _ in keys)
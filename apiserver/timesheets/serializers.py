@@ -1,15 +1,24 @@
 from datetime import date, timedelta
-from django.db.models import Sum, Count
+from decimal import Decimal
+from django.db.models import Sum, Count, F
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
-from django.db import transaction
+from projects.models import Project
 from .utils import (
     get_week_start_end_dates,
     get_week_drafts,
     validate_week_timesheets,
+    calculate_row_totals,
     calculate_week_totals,
     format_week_range,
 )
-from .models import Timesheet
+from .models import Timesheet, TimesheetDailyRollup
+from .rollups import refresh_daily_rollups
+from .submission import bulk_submit_timesheets
+
+# Smallest non-zero grid cell, as Timesheet.hours_worked's MinValueValidator
+MIN_CELL_HOURS = Decimal('0.1')
 
 class TimesheetSerializer(serializers.ModelSerializer):
     """Full serializer for detail views and create/update operations"""
@@ -39,7 +48,17 @@ class TimesheetSerializer(serializers.ModelSerializer):
         return obj.project.get_activity_types() if obj.project else []
     
     def get_daily_total_hours(self, obj):
-        return float(obj.total_hours_for_date)
+        # Prefer the with_daily_totals() annotation; bare instances fall back to a query
+        total = getattr(obj, 'daily_total_hours', None)
+        if total is None:
+            total = obj.total_hours_for_date
+        return float(total)
+
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        # The annotated total predates this edit
+        instance.__dict__.pop('daily_total_hours', None)
+        return instance
     
     def validate(self, data):
         request = self.context.get('request')
@@ -93,6 +112,51 @@ class TimesheetListSerializer(serializers.ModelSerializer):
             "created_at", "submitted_at"
         ]
 
+    # Columns read by the values() fast path; project_id is there for the week totals
+    VALUE_COLUMNS = [
+        'id', 'user_name', 'project_name', 'project_id', 'activity_type', 'date',
+        'hours_worked', 'description', 'status', 'created_at', 'submitted_at',
+    ]
+
+    @classmethod
+    def values(cls, queryset):
+        """The queryset as dicts of the columns rows_data() needs, email joined in"""
+        return queryset.values(*cls.VALUE_COLUMNS, user_email=F('user__email'))
+
+    @classmethod
+    def rows_data(cls, rows):
+        """
+        Payload for rows of values(), identical to serializing the model instances
+
+        Skips building a model instance and running every field per row: dates,
+        hours and timestamps still go through the serializer's own fields so their
+        formatting follows the REST_FRAMEWORK settings.
+        """
+        fields = cls().fields
+        to_date = fields['date'].to_representation
+        to_hours = fields['hours_worked'].to_representation
+        to_created = fields['created_at'].to_representation
+        to_submitted = fields['submitted_at'].to_representation
+        labels = dict(Timesheet.STATUS_CHOICES)
+        return [{
+            'id': row['id'],
+            'user_email': row['user_email'],
+            'user_name': row['user_name'],
+            'project_name': row['project_name'],
+            'activity_type': row['activity_type'],
+            'date': to_date(row['date']),
+            'hours_worked': to_hours(row['hours_worked']),
+            'description': row['description'],
+            'status': row['status'],
+            'status_display': str(labels.get(row['status'], row['status'])),
+            'can_edit': row['status'] == 'draft',
+            'created_at': to_created(row['created_at']),
+            'submitted_at': (
+                None if row['submitted_at'] is None
+                else to_submitted(row['submitted_at'])
+            ),
+        } for row in rows]
+
 class TimesheetCreateSerializer(serializers.ModelSerializer):
     """Serializer for timesheet creation - ALWAYS creates drafts only"""
     
@@ -171,11 +235,18 @@ class WeekSubmissionSerializer(serializers.Serializer):
             raise serializers.ValidationError("Week start date must be a Monday")
         return value
 
+    def validate_force_submit(self, value):
+        if value:
+            raise serializers.ValidationError(
+                "Submission can no longer be forced: errors always block it and "
+                "warnings never do"
+            )
+        return value
+
     def save(self):
         user = self.context['request'].user
         week_start = self.validated_data['week_start_date']
         ids = self.validated_data.get('timesheet_ids')
-        force = self.validated_data.get('force_submit', False)
 
         # Fetch timesheets
         if ids:
@@ -186,36 +257,210 @@ class WeekSubmissionSerializer(serializers.Serializer):
         else:
             qs = get_week_drafts(user, week_start)
 
-        if not qs.exists():
+        timesheets = list(qs.select_related('user'))
+        if not timesheets:
             raise serializers.ValidationError({
                 'error': 'No draft timesheets found',
                 'week_range': format_week_range(week_start)
             })
 
-        timesheets = list(qs.select_related('project', 'user'))
         validation = validate_week_timesheets(timesheets)
 
-        if not validation['is_valid'] and not force:
+        # Week warnings are informational; only per-row errors block the submission
+        if not validation['is_valid']:
             raise serializers.ValidationError({
                 'error': 'Validation failed',
                 'validation_errors': validation['timesheet_errors'],
                 'week_warnings': validation['week_warnings']
             })
 
-        with transaction.atomic():
-            [t.submit() for t in timesheets]
+        submitted_count = bulk_submit_timesheets(timesheets)
 
         summary = calculate_week_totals(timesheets)
         return {
             'message': 'Week submitted successfully',
             'week_range': format_week_range(week_start),
-            'submitted_count': len(timesheets),
+            'submitted_count': submitted_count,
             'total_hours': summary['total_hours'],
             'summary': summary,
             'submitted_timesheets': TimesheetListSerializer(timesheets, many=True).data
         }
 
 
+class WeekGridCellSerializer(serializers.Serializer):
+    """One project x activity x day cell of the week grid"""
+    project = serializers.IntegerField()
+    activity_type = serializers.CharField(max_length=100)
+    date = serializers.DateField()
+    hours_worked = serializers.DecimalField(
+        max_digits=5, decimal_places=2, min_value=0, max_value=24,
+        help_text="0 clears the cell"
+    )
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True
+    )
+
+    def validate_hours_worked(self, value):
+        # The grid saves with bulk_create/bulk_update, which skip the model validators
+        if value and value < MIN_CELL_HOURS:
+            raise serializers.ValidationError(
+                "Ensure this value is 0 to clear the cell or at least "
+                f"{MIN_CELL_HOURS}."
+            )
+        return value
+
+
+class WeekGridSerializer(serializers.Serializer):
+    """Replace a user's draft week with the given grid in one transaction"""
+    week_start_date = serializers.DateField(help_text="Monday of the week (YYYY-MM-DD)")
+    cells = WeekGridCellSerializer(many=True)
+
+    def validate_week_start_date(self, value):
+        if value.weekday() != 0:
+            raise serializers.ValidationError("Week start date must be a Monday")
+        return value
+
+    def validate(self, data):
+        user = self.context['request'].user
+        if not user.is_active:
+            raise serializers.ValidationError(
+                "Cannot create timesheet for inactive user."
+            )
+
+        week_start, week_end = get_week_start_end_dates(data['week_start_date'])
+        seen = set()
+        for cell in data['cells']:
+            if not week_start <= cell['date'] <= week_end:
+                raise serializers.ValidationError(
+                    f"Date {cell['date']} is outside the week "
+                    f"{format_week_range(week_start)}."
+                )
+            key = (cell['project'], cell['activity_type'], cell['date'])
+            if key in seen:
+                raise serializers.ValidationError(
+                    f'Duplicate cell for project {cell["project"]} with activity '
+                    f'"{cell["activity_type"]}" on {cell["date"]}.'
+                )
+            seen.add(key)
+
+        project_ids = {cell['project'] for cell in data['cells']}
+        projects = Project.objects.in_bulk(project_ids)
+        missing = project_ids - projects.keys()
+        if missing:
+            raise serializers.ValidationError(
+                f"Unknown project ids: {', '.join(str(pk) for pk in sorted(missing))}"
+            )
+        inactive = [p.name for p in projects.values() if p.status != 'active']
+        if inactive:
+            raise serializers.ValidationError(
+                "Cannot create timesheet for inactive project: "
+                f"{', '.join(sorted(inactive))}"
+            )
+
+        data['projects'] = projects
+        data['week_range'] = (week_start, week_end)
+        return data
+
+    def save(self):
+        user = self.context['request'].user
+        week_start, week_end = self.validated_data['week_range']
+        projects = self.validated_data['projects']
+
+        try:
+            with transaction.atomic():
+                to_create, to_update, delete_ids = self.apply_cells(
+                    user, week_start, week_end, projects
+                )
+        except IntegrityError:
+            # A concurrent request created one of the cells between our read and insert
+            raise serializers.ValidationError({'non_field_errors': [
+                'The week was changed by another request, reload it and try again.'
+            ]}) from None
+
+        timesheets = TimesheetListSerializer.values(
+            Timesheet.objects
+            .filter(user=user, date__range=[week_start, week_end])
+            .order_by('date', 'created_at')
+        )
+
+        return {
+            'message': 'Week grid saved successfully',
+            'week_range': format_week_range(week_start),
+            'created_count': len(to_create),
+            'updated_count': len(to_update),
+            'deleted_count': len(delete_ids),
+            'timesheets': TimesheetListSerializer.rows_data(timesheets)
+        }
+
+    def apply_cells(self, user, week_start, week_end, projects):
+        """Write the grid over the locked week; returns (created, updated, deleted)"""
+        existing = {
+            (ts.project_id, ts.activity_type, ts.date): ts
+            for ts in Timesheet.objects.select_for_update().filter(
+                user=user, date__range=[week_start, week_end]
+            )
+        }
+
+        now = timezone.now()
+        to_create, to_update, keep = [], [], set()
+        for cell in self.validated_data['cells']:
+            key = (cell['project'], cell['activity_type'], cell['date'])
+            ts = existing.get(key)
+            description = cell.get('description', ts.description if ts else None)
+            changed = ts and (
+                ts.hours_worked != cell['hours_worked'] or ts.description != description
+            )
+
+            if ts and ts.status != 'draft':
+                keep.add(key)
+                if changed:
+                    raise serializers.ValidationError({
+                        'non_field_errors': [
+                            f'Timesheet {ts.id} for "{ts.activity_type}" on {ts.date} '
+                            f'is already submitted and cannot be edited.'
+                        ]
+                    })
+                continue
+
+            if not cell['hours_worked']:
+                continue
+            keep.add(key)
+
+            if ts:
+                if changed:
+                    ts.hours_worked = cell['hours_worked']
+                    ts.description = description
+                    ts.updated_at = now
+                    to_update.append(ts)
+                continue
+
+            project = projects[cell['project']]
+            to_create.append(Timesheet(
+                user=user,
+                project=project,
+                activity_type=cell['activity_type'],
+                date=cell['date'],
+                hours_worked=cell['hours_worked'],
+                description=description,
+                status='draft',
+                user_name=user.get_full_name(),
+                project_name=project.name,
+            ))
+
+        delete_ids = [ts.id for key, ts in existing.items() if key not in keep]
+
+        # Writes by id are bounded on the week too, so Postgres prunes to its partitions
+        week = Timesheet.objects.filter(date__range=[week_start, week_end])
+        Timesheet.objects.bulk_create(to_create)
+        week.bulk_update(to_update, ['hours_worked', 'description', 'updated_at'])
+        if delete_ids:
+            week.filter(id__in=delete_ids).delete()
+        refresh_daily_rollups(
+            {(user.id, week_start + timedelta(days=offset)) for offset in range(7)}
+        )
+        return to_create, to_update, delete_ids
+
+
 class WeekSummarySerializer(serializers.Serializer):
     """Serializer for week summary data"""
     week_start = serializers.DateField(
@@ -235,20 +480,33 @@ class WeekSummarySerializer(serializers.Serializer):
             validated["week_start"] = today - timedelta(days=today.weekday())
         return validated
 
-    def to_representation(self, validated_data):
-        user = self.context['request'].user
-        week_start_date = validated_data['week_start']
+    def week_timesheets(self):
+        """The user's timesheets for the validated week as list rows, display order"""
+        week_start, week_end = get_week_start_end_dates(
+            self.validated_data['week_start']
+        )
+        return TimesheetListSerializer.values(
+            Timesheet.objects
+            .filter(
+                user=self.context['request'].user,
+                date__range=[week_start, week_end],
+            )
+            .order_by('date', 'created_at')
+        )
 
-        # Get boundaries
-        week_start, week_end = get_week_start_end_dates(week_start_date)
+    def to_representation(self, validated_data):
+        # Fetch the week once; totals and status counts come from the loaded rows
+        return self.summarize(validated_data, list(self.week_timesheets()))
 
-        # Fetch timesheets
-        timesheets = (Timesheet.objects
-            .filter(user=user, date__range=[week_start, week_end])
-            .select_related('project')
-            .order_by('date', 'created_at'))
+    async def adata(self):
+        """Representation for async views, fetching the week with the async ORM"""
+        rows = [row async for row in self.week_timesheets()]
+        return self.summarize(self.validated_data, rows)
 
-        totals = calculate_week_totals(timesheets)
+    def summarize(self, validated_data, rows):
+        week_start_date = validated_data['week_start']
+        week_start, week_end = get_week_start_end_dates(week_start_date)
+        totals = calculate_row_totals(rows)
 
         return {
             'week_start_date': week_start,
@@ -258,11 +516,11 @@ class WeekSummarySerializer(serializers.Serializer):
             'total_entries': totals['total_entries'],
             'unique_projects': totals['unique_projects'],
             'unique_dates': totals['unique_dates'],
-            'draft_count': timesheets.filter(status='draft').count(),
-            'submitted_count': timesheets.filter(status='submitted').count(),
+            'draft_count': sum(1 for row in rows if row['status'] == 'draft'),
+            'submitted_count': sum(1 for row in rows if row['status'] == 'submitted'),
             'daily_totals': totals['daily_totals'],
             'project_totals': totals['project_totals'],
-            'timesheets': TimesheetListSerializer(timesheets, many=True).data
+            'timesheets': TimesheetListSerializer.rows_data(rows)
         }
 
 
@@ -294,24 +552,22 @@ class BulkTimesheetActionSerializer(serializers.Serializer):
 
         # === Submit ===
         if action == 'submit':
-            drafts = timesheets.filter(status='draft')
-            if not drafts.exists():
+            drafts = list(timesheets.filter(status='draft'))
+            if not drafts:
                 raise serializers.ValidationError("No draft timesheets to submit")
 
-            validation = validate_week_timesheets(list(drafts))
+            validation = validate_week_timesheets(drafts)
             if not validation['is_valid']:
                 raise serializers.ValidationError({
                     'error': 'Validation failed',
                     'validation_errors': validation
                 })
 
-            with transaction.atomic():
-                for t in drafts:
-                    t.submit()
+            submitted_count = bulk_submit_timesheets(drafts)
 
             return {
-                'message': f'Successfully submitted {drafts.count()} timesheets',
-                'submitted_count': drafts.count()
+                'message': f'Successfully submitted {submitted_count} timesheets',
+                'submitted_count': submitted_count
             }
 
         # === Delete ===
@@ -349,9 +605,9 @@ class ValidateWeekTimesheetsSerializer(serializers.Serializer):
         week_start_date = validated_data['week_start_date']
 
         # Fetch draft timesheets
-        drafts = get_week_drafts(user, week_start_date)
+        drafts = list(get_week_drafts(user, week_start_date))
 
-        if not drafts.exists():
+        if not drafts:
             return {
                 'message': 'No draft timesheets found for validation',
                 'week_range': format_week_range(week_start_date),
@@ -359,12 +615,12 @@ class ValidateWeekTimesheetsSerializer(serializers.Serializer):
                 'has_warnings': False
             }
 
-        validation = validate_week_timesheets(list(drafts))
+        validation = validate_week_timesheets(drafts)
 
         return {
             'week_range': format_week_range(week_start_date),
             'validation_result': validation,
-            'timesheets_checked': drafts.count()
+            'timesheets_checked': len(drafts)
         }
 
 class TimesheetSummarySerializer(serializers.Serializer):
@@ -376,27 +632,30 @@ class TimesheetSummarySerializer(serializers.Serializer):
 
     @classmethod
     def build(cls, user, date_from, date_to):
-        qs = Timesheet.objects.filter(user=user, date__gte=date_from, date__lte=date_to)
+        # Read from the daily rollup so cost scales with days, not entries
+        qs = TimesheetDailyRollup.objects.filter(
+            user=user, date__gte=date_from, date__lte=date_to
+        )
 
         return cls({
             "date_from": date_from,
             "date_to": date_to,
             "daily_summary": list(
                 qs.values("date").annotate(
-                    total_hours=Sum("hours_worked"),
+                    total_hours=Sum("total_hours"),
                     project_count=Count("project", distinct=True)
                 ).order_by("date")
             ),
             "project_summary": list(
                 qs.values("project__name").annotate(
-                    total_hours=Sum("hours_worked"),
-                    entry_count=Count("id")
+                    total_hours=Sum("total_hours"),
+                    entry_count=Sum("entry_count")
                 ).order_by("-total_hours")
             ),
             "activity_summary": list(
                 qs.values("activity_type").annotate(
-                    total_hours=Sum("hours_worked"),
-                    entry_count=Count("id")
+                    total_hours=Sum("total_hours"),
+                    entry_count=Sum("entry_count")
                 ).order_by("-total_hours")
             ),
         })
@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .rollups import refresh_daily_rollups
+
+
+def bulk_submit_timesheets(timesheets):
+    """
+    Flip draft timesheets to submitted with a single UPDATE
+
+    Rows that stopped being drafts in the meantime are left untouched. The in-memory
+    objects are updated to match so they can be serialized in the response.
+
+    Args:
+        timesheets: list of validated draft Timesheet objects
+
+    Returns:
+        int: number of rows actually submitted
+    """
+    from .models import Timesheet
+
+    if not timesheets:
+        return 0
+    now = timezone.now()
+    dates = [ts.date for ts in timesheets]
+    with transaction.atomic():
+        # Bounded on date as well so Postgres only visits the partitions involved
+        submitted_count = Timesheet.objects.filter(
+            id__in=[ts.id for ts in timesheets],
+            date__range=[min(dates), max(dates)],
+            status='draft',
+        ).update(status='submitted', submitted_at=now, updated_at=now)
+        refresh_daily_rollups({(ts.user_id, ts.date) for ts in timesheets})
+
+    for ts in timesheets:
+        if ts.status == 'draft':
+            ts.status = 'submitted'
+            ts.submitted_at = now
+            ts.updated_at = now
+    return submitted_count
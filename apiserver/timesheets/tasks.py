@@ -0,0 +1,213 @@
+import logging
+import os
+import time
+
+from celery import shared_task
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from accounts.models import User
+from projects.models import Project
+from .cache import invalidate_dashboard
+from .exports import EXPORT_CHUNK_SIZE, export_lines
+from .models import Timesheet, TimesheetDailyRollup
+from .partitioning import (
+    detach_old_partitions,
+    ensure_future_partitions,
+    is_partitioned,
+)
+from .utils import apply_admin_filters, parse_admin_filters
+
+logger = logging.getLogger(__name__)
+
+NAME_PROPAGATION_BATCH_SIZE = 1000
+
+
+def export_file_path(job_id, export_format):
+    return os.path.join(settings.TIMESHEET_EXPORT_DIR, f"{job_id}.{export_format}")
+
+
+@shared_task(bind=True)
+def export_timesheets_task(self, params, export_format):
+    """
+    Write a filtered timesheet export to a file, reporting progress as it goes
+
+    Args:
+        params: admin filter parameters, as accepted by parse_admin_filters
+        export_format: 'csv' or 'ndjson'
+    """
+    filters, date_from, date_to, date_range = parse_admin_filters(params)
+    qs = apply_admin_filters(Timesheet.objects.all(), filters, date_range)
+    total_rows = qs.count()
+
+    os.makedirs(settings.TIMESHEET_EXPORT_DIR, exist_ok=True)
+    path = export_file_path(self.request.id, export_format)
+    partial_path = f"{path}.part"
+
+    rows = 0
+    with open(partial_path, "w", newline="") as export_file:
+        lines = export_lines(qs, export_format)
+        if export_format == "csv":
+            export_file.write(next(lines))  # header
+        for line in lines:
+            export_file.write(line)
+            rows += 1
+            if rows % EXPORT_CHUNK_SIZE == 0:
+                progress = {"rows": rows, "total_rows": total_rows}
+                self.update_state(state="PROGRESS", meta=progress)
+    os.replace(partial_path, path)
+
+    logger.info(f"Timesheet export {self.request.id} finished: {rows} rows")
+    return {"rows": rows, "total_rows": total_rows, "file": os.path.basename(path)}
+
+
+@shared_task
+def cleanup_expired_exports():
+    """Delete export files older than TIMESHEET_EXPORT_TTL"""
+    export_dir = settings.TIMESHEET_EXPORT_DIR
+    if not os.path.isdir(export_dir):
+        return 0
+
+    cutoff = time.time() - settings.TIMESHEET_EXPORT_TTL.total_seconds()
+    removed = 0
+    for name in os.listdir(export_dir):
+        path = os.path.join(export_dir, name)
+        if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    logger.info(f"Removed {removed} expired timesheet exports")
+    return removed
+
+
+@shared_task
+def maintain_timesheet_partitions():
+    """
+    Pre-create upcoming monthly partitions and detach ones past the retention window
+
+    The daily rollups of detached months are deleted in the same transaction, so
+    the dashboards stop counting rows that left the table.
+    """
+    if connection.vendor != "postgresql":
+        return {"created": [], "detached": []}
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            return {"created": [], "detached": []}
+        created = ensure_future_partitions(
+            cursor, settings.TIMESHEET_PARTITION_MONTHS_AHEAD
+        )
+        detached = []
+        if settings.TIMESHEET_PARTITION_RETENTION_MONTHS is not None:
+            detached = detach_old_partitions(
+                cursor, settings.TIMESHEET_PARTITION_RETENTION_MONTHS
+            )
+        for _, lower, upper in detached:
+            rollups = TimesheetDailyRollup.objects.filter(
+                date__gte=lower, date__lt=upper
+            )
+            rollups.delete()
+        invalidate_dashboard(lower for _, lower, _ in detached)
+
+    detached = [name for name, _, _ in detached]
+    logger.info(f"Timesheet partitions created: {created}, detached: {detached}")
+    return {"created": created, "detached": detached}
+
+
+def rewrite_denormalized_name(
+    owner_field, owner_id, name_field, name, batch_size=NAME_PROPAGATION_BATCH_SIZE
+):
+    """
+    Rewrite a denormalized name column on one owner's timesheets in keyed batches
+
+    Each batch is a short transaction updating at most `batch_size` rows by id,
+    so row locks are held briefly and never on the whole table. `updated_at` is
+    bumped too, which moves the conditional GET validators of the affected lists.
+
+    Returns:
+        int: number of rows rewritten
+    """
+    stale = Timesheet.objects.filter(**{owner_field: owner_id}).exclude(
+        **{name_field: name}
+    )
+    last_id, updated, months = 0, 0, set()
+    while True:
+        batch = list(
+            stale.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "date")[:batch_size]
+        )
+        if not batch:
+            break
+        ids = [row_id for row_id, _ in batch]
+        dates = [day for _, day in batch]
+        with transaction.atomic():
+            # The date bounds let Postgres prune to the partitions the batch lives in
+            updated += (
+                Timesheet.objects
+                .filter(**{owner_field: owner_id}, id__in=ids,
+                        date__range=[min(dates), max(dates)])
+                .exclude(**{name_field: name})
+                .update(**{name_field: name, "updated_at": timezone.now()})
+            )
+        last_id = ids[-1]
+        months.update(day.replace(day=1) for day in dates)
+    invalidate_dashboard(months)
+    return updated
+
+
+@shared_task
+def propagate_user_name(user_id):
+    """Copy a user's current full name onto their timesheets"""
+    user = User.objects.filter(pk=user_id).only("first_name", "last_name").first()
+    if user is None:
+        return 0
+    updated = rewrite_denormalized_name(
+        "user_id", user_id, "user_name", user.get_full_name()
+    )
+    logger.info(f"Propagated name of user {user_id} to {updated} timesheets")
+    return updated
+
+
+@shared_task
+def propagate_project_name(project_id):
+    """Copy a project's current name onto its timesheets"""
+    name = Project.objects.filter(pk=project_id).values_list("name", flat=True).first()
+    if name is None:
+        return 0
+    updated = rewrite_denormalized_name("project_id", project_id, "project_name", name)
+    logger.info(f"Propagated name of project {project_id} to {updated} timesheets")
+    return updated
+
+
+@shared_task
+def sweep_stale_names():
+    """
+    Propagate the names of users and projects whose timesheets still show an old one
+
+    Catches up on renames whose propagation task was never queued, e.g. because
+    the broker was unreachable when the user or project was saved.
+    """
+    full_name = Concat(F("user__first_name"), Value(" "), F("user__last_name"))
+    user_ids = list(
+        Timesheet.objects.exclude(user_name=full_name)
+        .order_by()
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    project_ids = list(
+        Timesheet.objects.exclude(project_name=F("project__name"))
+        .order_by()
+        .values_list("project_id", flat=True)
+        .distinct()
+    )
+    for user_id in user_ids:
+        propagate_user_name(user_id)
+    for project_id in project_ids:
+        propagate_project_name(project_id)
+    logger.info(
+        f"Swept stale names of {len(user_ids)} users and {len(project_ids)} projects"
+    )
+    return {"users": user_ids, "projects": project_ids}
@@ -0,0 +1,885 @@
+import csv
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice, product
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.db.models import Count, Sum
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from django.utils import timezone
+from django.utils.connection import ConnectionDoesNotExist
+from kombu.exceptions import OperationalError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from apiserver.db_router import using_replica
+from apiserver.testing import QueryBudgetMixin
+from projects.models import Project
+from .cache import DASHBOARD_CACHE_TIMEOUT, get_or_build_dashboard
+from .conditional import not_modified_response, set_validators
+from .exports import EXPORT_HEADERS
+from .models import Timesheet, TimesheetDailyRollup
+from .partitioning import (
+    DEFAULT_PARTITION, add_months, create_month_partition, detach_old_partitions,
+    ensure_future_partitions, list_partitions, partition_name,
+)
+from .rollups import refresh_daily_rollups
+from .serializers import TimesheetListSerializer
+from .submission import bulk_submit_timesheets
+from .tasks import export_timesheets_task, sweep_stale_names
+from .utils import validate_week_timesheets
+from .views import _export_job_cache_key, build_admin_dashboard
+
+ACTIVITIES = ['Development', 'Review']
+
+
+# Tasks run in-process with their results kept in memory
+eager_celery = override_settings(
+    CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_STORE_EAGER_RESULT=True,
+    CELERY_RESULT_BACKEND='cache+memory://',
+)
+
+
+@eager_celery
+class TimesheetQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    urlconf = 'timesheets.urls'
+    query_budgets = {
+        'timesheet-list-create': {'get': 2, 'post': 12},
+        'timesheet-detail': {'get': 3, 'patch': 10, 'delete': 8},
+        'my-timesheets': {'get': 2},
+        'user-info': {'get': 0},
+        'drafts-list': {'get': 2},
+        'submit-week': {'post': 13},
+        'week-grid': {'put': 11},
+        'week-summary': {'get': 2},
+        'validate-week': {'post': 5},
+        'bulk-actions': {'post:submit': 14, 'post:validate': 6, 'post:delete': 9},
+        'timesheet-summary': {'get': 3},
+        'project-activities': {'get': 2},
+        'find-existing-timesheet': {'get': 2},
+        'get-all-timesheets': {'get': 4},
+        'export-timesheets': {'get': 1},
+        'export-jobs': {'post': 2},
+        'export-job-detail': {'get': 0},
+        'export-job-download': {'get': 0},
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.export_dir = tempfile.mkdtemp()
+        cls.export_settings = override_settings(TIMESHEET_EXPORT_DIR=cls.export_dir)
+        cls.export_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.export_settings.disable()
+        shutil.rmtree(cls.export_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='budget@example.com', password='secret'
+        )
+        self.user.first_name, self.user.staff = 'Budget', True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        today = date.today()
+        self.week_start = today - timedelta(days=today.weekday() + 7)
+        self.week_end = self.week_start + timedelta(days=6)
+
+    def seed(self, rows):
+        """`rows` draft timesheets in last week, spread over enough projects"""
+        per_project = len(ACTIVITIES) * 7
+        projects = []
+        for index in range(-(-rows // per_project)):
+            project = Project.objects.create(name=f'Project {index}')
+            project.set_activity_types(ACTIVITIES)
+            projects.append(project)
+
+        cells = islice(product(projects, ACTIVITIES, range(7)), rows)
+        timesheets = Timesheet.objects.bulk_create([
+            Timesheet(user=self.user, project=project, activity_type=activity,
+                      date=self.week_start + timedelta(days=offset),
+                      hours_worked='1.00', status='draft',
+                      user_name=self.user.get_full_name(), project_name=project.name)
+            for project, activity, offset in cells
+        ])
+        refresh_daily_rollups({(self.user.id, ts.date) for ts in timesheets})
+        return {'projects': projects, 'timesheets': timesheets}
+
+    def build_request(self, name, label, context):
+        timesheets, project = context['timesheets'], context['projects'][0]
+        if name == 'timesheet-list-create' and label == 'post':
+            return {}, {'project': project.id, 'activity_type': ACTIVITIES[0],
+                        'date': (self.week_start - timedelta(days=7)).isoformat(),
+                        'hours_worked': '2.00'}
+        if name == 'timesheet-detail':
+            payload = {'description': 'Updated'} if label == 'patch' else {}
+            return {'pk': timesheets[0].id}, payload
+        if name == 'bulk-actions':
+            ids = [ts.id for ts in timesheets]
+            return {}, {'timesheet_ids': ids, 'action': label.split(':')[1]}
+        if name == 'project-activities':
+            return {'project_id': project.id}, {}
+        if name in ('export-job-detail', 'export-job-download'):
+            return {'job_id': self.run_export_job(self.week_range())}, {}
+        return {}, self.build_payload(name, timesheets)
+
+    def build_payload(self, name, timesheets):
+        """Payload of the routes that take no url kwargs and have no variants"""
+        week_start = self.week_start.isoformat()
+        if name in ('my-timesheets', 'timesheet-summary', 'get-all-timesheets',
+                    'export-timesheets', 'export-jobs'):
+            return self.week_range()
+        if name in ('submit-week', 'validate-week'):
+            return {'week_start_date': week_start}
+        if name == 'week-summary':
+            return {'week_start': week_start}
+        if name == 'week-grid':
+            cells = [{'project': ts.project_id, 'activity_type': ts.activity_type,
+                      'date': ts.date.isoformat(), 'hours_worked': '2.00'}
+                     for ts in timesheets]
+            return {'week_start_date': week_start, 'cells': cells}
+        if name == 'find-existing-timesheet':
+            first = timesheets[0]
+            return {'project_id': first.project_id,
+                    'activity_type': first.activity_type,
+                    'date': first.date.isoformat()}
+        return {}
+
+    def week_range(self):
+        return {
+            'date_from': self.week_start.isoformat(),
+            'date_to': self.week_end.isoformat(),
+        }
+
+    def run_export_job(self, params):
+        result = export_timesheets_task.delay(params, 'csv')
+        job = {'user_id': self.user.id, 'export_format': 'csv'}
+        cache.set(_export_job_cache_key(result.id), job)
+        return result.id
+
+
+class ValidateWeekTimesheetsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='week@example.com', password='secret'
+        )
+        self.project = Project.objects.create(name='Apollo')
+        self.project.set_activity_types(ACTIVITIES)
+        today = date.today()
+        self.monday = today - timedelta(days=today.weekday() + 7)
+
+    def entry(self, offset=0, hours='8.00', activity=ACTIVITIES[0], project=None,
+              **fields):
+        return Timesheet.objects.create(
+            user=self.user, project=project or self.project, activity_type=activity,
+            date=self.monday + timedelta(days=offset), hours_worked=hours, **fields
+        )
+
+    def errors_by_id(self, validation):
+        rows = validation['timesheet_errors']
+        return {row['timesheet_id']: row['errors'] for row in rows}
+
+    def test_full_week_is_valid_without_warnings(self):
+        week = [self.entry(offset) for offset in range(5)]
+        validation = validate_week_timesheets(week)
+        self.assertTrue(validation['is_valid'])
+        self.assertFalse(validation['has_warnings'])
+        self.assertEqual(validation['summary']['total_hours'], 40)
+
+    def test_daily_cap_counts_entries_outside_the_set(self):
+        self.entry(hours='20.00', status='submitted', activity=ACTIVITIES[1])
+        draft = self.entry(hours='6.00')
+        errors = self.errors_by_id(validate_week_timesheets([draft]))
+        self.assertEqual(len(errors[draft.id]), 1)
+        self.assertIn('24 hour daily limit', errors[draft.id][0])
+
+    def test_rule_violations_are_reported_per_row(self):
+        closed = Project.objects.create(name='Closed', status='completed')
+        future = self.entry(offset=21)
+        wrong_activity = self.entry(offset=1, activity='Sleeping')
+        inactive_project = self.entry(offset=2, project=closed)
+        fine = self.entry(offset=3)
+
+        entries = [future, wrong_activity, inactive_project, fine]
+        with self.assertNumQueries(4):
+            validation = validate_week_timesheets(entries)
+        errors = self.errors_by_id(validation)
+        self.assertFalse(validation['is_valid'])
+        self.assertEqual(errors[future.id], ['Date cannot be in the future.'])
+        self.assertIn('not valid for project "Apollo"', errors[wrong_activity.id][0])
+        self.assertEqual(
+            errors[inactive_project.id],
+            ['Cannot submit timesheet for inactive project.'],
+        )
+        self.assertNotIn(fine.id, errors)
+
+    def test_duplicates_within_the_set(self):
+        saved = self.entry()
+        duplicate = Timesheet(user=self.user, project=self.project,
+                              activity_type=saved.activity_type, date=saved.date,
+                              hours_worked='1.00')
+        errors = self.errors_by_id(validate_week_timesheets([saved, duplicate]))
+        self.assertIn('Duplicate entry', errors[saved.id][0])
+
+    def test_missing_and_long_days_are_warnings(self):
+        validation = validate_week_timesheets([self.entry(hours='14.00')])
+        self.assertTrue(validation['is_valid'])
+        self.assertEqual(len(validation['week_warnings']), 5)
+        self.assertIn('14.00 hours logged', validation['week_warnings'][0])
+
+    def test_warnings_do_not_block_submission(self):
+        self.entry(hours='14.00')
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            '/api/timesheets/submit-week/', {'week_start_date': self.monday.isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['submitted_count'], 1)
+
+    def test_forced_submission_is_rejected(self):
+        self.entry()
+        self.client.force_authenticate(self.user)
+        data = {'week_start_date': self.monday.isoformat(), 'force_submit': True}
+        response = self.client.post('/api/timesheets/submit-week/', data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('force_submit', response.data)
+        self.assertFalse(Timesheet.objects.filter(status='submitted').exists())
+
+    def test_only_the_weeks_in_the_set_are_read(self):
+        early, late = self.entry(offset=-28), self.entry()
+        self.entry(offset=-14, hours='20.00')  # in the gap between them
+        with CaptureQueriesContext(connection) as queries:
+            validation = validate_week_timesheets([early, late])
+        self.assertTrue(validation['is_valid'])
+        # One date range per (user, week) instead of one spanning the gap
+        others = queries.captured_queries[-1]['sql']
+        self.assertEqual(others.count('BETWEEN'), 2)
+
+
+class AdminDashboardTests(APITestCase):
+    filters = dict.fromkeys(
+        (
+            'user_id', 'project_id', 'status', 'activity_type',
+            'user_search', 'project_search',
+        )
+    )
+    date_range = (date.today(), date.today())
+
+    def cached_for(self, alias):
+        """Timeout the dashboard built while reading from `alias` is cached with"""
+        dashboard = build_admin_dashboard(self.filters, self.date_range)
+        with using_replica(alias), mock.patch.object(cache, 'set') as cache_set:
+            get_or_build_dashboard(self.filters, self.date_range, lambda: dashboard)
+        cache_set.assert_called_once_with(mock.ANY, dashboard, mock.ANY)
+        return cache_set.call_args.args[2]
+
+    def test_replica_results_expire_within_the_lag_window(self):
+        self.assertEqual(self.cached_for(None), DASHBOARD_CACHE_TIMEOUT)
+        with self.settings(REPLICA_MAX_LAG_SECONDS=3):
+            self.assertEqual(self.cached_for('replica'), 3)
+
+    def test_built_on_the_routed_database(self):
+        # No "lagging" database is configured, so the replica read must fail
+        with using_replica('lagging'), self.assertRaises(ConnectionDoesNotExist):
+            build_admin_dashboard(self.filters, self.date_range)
+
+
+class AllTimesheetsCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='count@example.com', password='secret'
+        )
+        self.user.staff = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        project = Project.objects.create(name='Apollo')
+        project.set_activity_types(ACTIVITIES)
+        for activity in ACTIVITIES:
+            Timesheet.objects.create(
+                user=self.user, project=project, activity_type=activity,
+                date=date.today(), hours_worked='1.00',
+            )
+
+    def pagination(self, **params):
+        response = self.client.get('/api/timesheets/all/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['pagination']
+
+    def test_rollup_total_is_exact_and_runs_no_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            pagination = self.pagination(page_size=1, offset=1)
+        self.assertEqual(pagination, {
+            'total_count': 2, 'count_is_exact': True, 'page_size': 1, 'offset': 1,
+            'has_more': False,
+        })
+        counts = [query['sql'] for query in queries
+                  if query['sql'].startswith('SELECT COUNT(*)')]
+        self.assertEqual(counts, [])
+
+    def test_estimated_total_is_flagged(self):
+        with mock.patch('apiserver.pagination.estimate_count', return_value=50_000):
+            pagination = self.pagination(count='estimated', page_size=1)
+        self.assertEqual(
+            (pagination['total_count'], pagination['count_is_exact']), (50_000, False)
+        )
+        self.assertTrue(pagination['has_more'])
+
+    def test_small_estimates_are_counted(self):
+        with mock.patch('apiserver.pagination.estimate_count', return_value=12):
+            pagination = self.pagination(count='estimated')
+        self.assertEqual(
+            (pagination['total_count'], pagination['count_is_exact']), (2, True)
+        )
+
+
+class TimesheetListFastPathTests(APITestCase):
+    def test_rows_data_matches_the_model_serializer(self):
+        user = User.objects.create_user(email='rows@example.com', password='secret')
+        user.first_name = 'Zoë'
+        user.save()
+        project = Project.objects.create(name='Apollo "11"')
+        project.set_activity_types(ACTIVITIES)
+        monday = date.today() - timedelta(days=date.today().weekday() + 7)
+        for offset, (hours, description, status) in enumerate([
+            ('7.50', None, 'draft'),
+            ('0.25', '', 'draft'),
+            ('12.00', 'Line\nbreak', 'submitted'),
+        ]):
+            Timesheet.objects.create(
+                user=user, project=project, activity_type=ACTIVITIES[offset % 2],
+                date=monday + timedelta(days=offset), hours_worked=hours,
+                description=description, status=status,
+                submitted_at=timezone.now() if status == 'submitted' else None,
+            )
+
+        timesheets = (
+            Timesheet.objects.filter(user=user)
+            .select_related('user')
+            .order_by('-date', '-created_at')
+        )
+        with self.assertNumQueries(1):
+            rows = TimesheetListSerializer.values(timesheets)
+            fast = TimesheetListSerializer.rows_data(rows)
+        # Byte-for-byte, so key order and value formatting are covered too
+        renderer = JSONRenderer()
+        slow = TimesheetListSerializer(timesheets, many=True).data
+        self.assertEqual(renderer.render(fast), renderer.render(slow))
+
+
+class WeekGridTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='grid@example.com', password='secret'
+        )
+        self.client.force_authenticate(self.user)
+        self.project = Project.objects.create(name='Apollo')
+        self.project.set_activity_types(ACTIVITIES)
+        today = date.today()
+        self.monday = today - timedelta(days=today.weekday() + 7)
+
+    def put_grid(self, hours):
+        cell = {'project': self.project.id, 'activity_type': ACTIVITIES[0],
+                'date': self.monday.isoformat(), 'hours_worked': hours}
+        data = {'week_start_date': self.monday.isoformat(), 'cells': [cell]}
+        return self.client.put('/api/timesheets/week-grid/', data, format='json')
+
+    def test_cells_below_the_model_minimum_are_rejected(self):
+        response = self.put_grid('0.05')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('hours_worked', response.data['cells'][0])
+        self.assertFalse(Timesheet.objects.exists())
+        self.assertEqual(self.put_grid('0.10').status_code, 200)
+        self.assertEqual(self.put_grid('0').status_code, 200)
+        self.assertFalse(Timesheet.objects.exists())
+
+    def test_concurrent_insert_is_a_client_error(self):
+        bulk_create = mock.patch.object(
+            Timesheet.objects, 'bulk_create', side_effect=IntegrityError
+        )
+        with bulk_create:
+            response = self.put_grid('2.00')
+        self.assertEqual(response.status_code, 400)
+        error = response.data['non_field_errors'][0]
+        self.assertIn('changed by another request', error)
+
+
+class ConditionalRequestTests(SimpleTestCase):
+    second = 1_700_000_000
+    validators = ('"v1"', second + 0.2)
+
+    def revalidate(self, validators, **headers):
+        request = RequestFactory().get('/', headers=headers)
+        return not_modified_response(request, validators)
+
+    def sent(self, validators):
+        return set_validators(HttpResponse(), validators)
+
+    def at(self, now):
+        return mock.patch('timesheets.conditional.time', **{'time.return_value': now})
+
+    def test_etag(self):
+        with self.at(self.second + 5):
+            response = self.revalidate(self.validators, if_none_match='"v1"')
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], '"v1"')
+            self.assertIsNone(self.revalidate(self.validators, if_none_match='"v0"'))
+
+    def test_settled_last_modified(self):
+        since = http_date(self.second)
+        with self.at(self.second + 1.5):
+            self.assertEqual(self.sent(self.validators)['Last-Modified'], since)
+            response = self.revalidate(self.validators, if_modified_since=since)
+            self.assertEqual(response.status_code, 304)
+            newer = ('"v2"', self.second + 1.2)
+            self.assertIsNone(self.revalidate(newer, if_modified_since=since))
+
+    def test_same_second_write_is_not_masked(self):
+        since = http_date(self.second)
+        # Fetched half-way through the second of the last write: no date to send
+        with self.at(self.second + 0.5):
+            self.assertNotIn('Last-Modified', self.sent(self.validators))
+        # Written again later in that second: date-only revalidation must not get a 304
+        rewritten = ('"v2"', self.second + 0.8)
+        with self.at(self.second + 0.9):
+            self.assertIsNone(self.revalidate(rewritten, if_modified_since=since))
+
+
+class ConditionalEndpointTests(APITestCase):
+    def test_revalidation_until_a_write(self):
+        url = '/api/timesheets/my-timesheets/'
+        user = User.objects.create_user(email='etag@example.com', password='secret')
+        self.client.force_authenticate(user)
+        project = Project.objects.create(name='Apollo')
+        project.set_activity_types(ACTIVITIES)
+        entry = {'user': user, 'project': project, 'date': date.today()}
+        Timesheet.objects.create(
+            **entry, activity_type=ACTIVITIES[0], hours_worked='1.00'
+        )
+
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Timesheet.objects.create(
+            **entry, activity_type=ACTIVITIES[1], hours_worked='2.00'
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+@eager_celery
+class NamePropagationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='rename@example.com', password='secret'
+        )
+        self.user.first_name, self.user.last_name = 'Ada', 'Lovelace'
+        self.user.save()
+        self.project = Project.objects.create(name='Apollo')
+        self.project.set_activity_types(ACTIVITIES)
+        self.timesheet = Timesheet.objects.create(
+            user=self.user, project=self.project, activity_type=ACTIVITIES[0],
+            date=date.today(), hours_worked='1.00',
+        )
+
+    def names(self):
+        self.timesheet.refresh_from_db()
+        return self.timesheet.user_name, self.timesheet.project_name
+
+    def test_user_rename_is_propagated(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.last_name = 'King'
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        self.assertEqual(self.names(), ('Ada King', 'Apollo'))
+
+    def test_project_rename_is_propagated(self):
+        project = Project.objects.get(pk=self.project.pk)
+        project.name = 'Artemis'
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+        self.assertEqual(self.names(), ('Ada Lovelace', 'Artemis'))
+
+    def test_saves_survive_a_broker_outage_and_the_sweep_catches_up(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Augusta'
+        project = Project.objects.get(pk=self.project.pk)
+        project.name = 'Artemis'
+        outage = OperationalError('broker unreachable')
+        with mock.patch('celery.app.task.Task.delay', side_effect=outage), \
+                self.assertLogs('django.test', 'ERROR') as logs, \
+                self.captureOnCommitCallbacks(execute=True):
+            user.save()
+            project.save()
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(self.names(), ('Ada Lovelace', 'Apollo'))
+
+        swept = sweep_stale_names()
+        self.assertEqual(swept, {'users': [user.pk], 'projects': [project.pk]})
+        self.assertEqual(self.names(), ('Augusta Lovelace', 'Artemis'))
+        self.assertEqual(sweep_stale_names(), {'users': [], 'projects': []})
+
+
+class DailyRollupSyncTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='rollup@example.com', password='secret'
+        )
+        self.other = User.objects.create_user(
+            email='other@example.com', password='secret'
+        )
+        self.project = Project.objects.create(name='Apollo')
+        self.project.set_activity_types(ACTIVITIES)
+        self.monday = date.today() - timedelta(days=date.today().weekday() + 7)
+
+    def create(self, offset=0, activity=ACTIVITIES[0], hours='2.00', **fields):
+        fields = {'user': self.user, 'project': self.project, **fields}
+        return Timesheet.objects.create(
+            activity_type=activity, date=self.monday + timedelta(days=offset),
+            hours_worked=hours, **fields,
+        )
+
+    def assertRollupsInSync(self):
+        keys = ['user_id', 'project_id', 'activity_type', 'date', 'status']
+        expected = {
+            tuple(row[key] for key in keys): (row['hours'], row['entries'])
+            for row in Timesheet.objects.order_by().values(*keys).annotate(
+                hours=Sum('hours_worked'), entries=Count('id')
+            )
+        }
+        stored = {
+            tuple(row[key] for key in keys): (row['total_hours'], row['entry_count'])
+            for row in TimesheetDailyRollup.objects.values(
+                *keys, 'total_hours', 'entry_count'
+            )
+        }
+        self.assertEqual(stored, expected)
+
+    def test_create(self):
+        self.create()
+        self.create(activity=ACTIVITIES[1], hours='1.50')
+        self.create(offset=1)
+        self.assertEqual(TimesheetDailyRollup.objects.count(), 3)
+        self.assertRollupsInSync()
+
+    def test_hours_date_and_user_changes(self):
+        timesheet = self.create()
+        self.create(activity=ACTIVITIES[1])
+        for field, value in [
+            ('hours_worked', Decimal('5.25')),
+            ('date', self.monday + timedelta(days=2)),
+            ('user', self.other),
+        ]:
+            with self.subTest(field=field):
+                setattr(timesheet, field, value)
+                timesheet.save()
+                self.assertRollupsInSync()
+
+    def test_instance_delete(self):
+        timesheet = self.create()
+        self.create(activity=ACTIVITIES[1])
+        timesheet.delete()
+        self.assertRollupsInSync()
+
+    def test_queryset_delete(self):
+        self.create()
+        self.create(offset=1)
+        self.create(user=self.other)
+        Timesheet.objects.filter(user=self.user).delete()
+        self.assertEqual(TimesheetDailyRollup.objects.count(), 1)
+        self.assertRollupsInSync()
+
+    def test_bulk_submit(self):
+        drafts = [
+            self.create(), self.create(offset=1), self.create(activity=ACTIVITIES[1])
+        ]
+        self.assertEqual(bulk_submit_timesheets(drafts[:2]), 2)
+        self.assertEqual(
+            TimesheetDailyRollup.objects.filter(status='submitted').count(), 2
+        )
+        self.assertRollupsInSync()
+
+    def test_week_grid_save(self):
+        self.create(offset=1)
+        self.create(offset=2, activity=ACTIVITIES[1])
+        # Updates one cell, clears another and adds a third
+        cells = [
+            {'project': self.project.id, 'activity_type': activity,
+             'date': (self.monday + timedelta(days=offset)).isoformat(),
+             'hours_worked': hours}
+            for offset, activity, hours in [
+                (1, ACTIVITIES[0], '3.00'), (2, ACTIVITIES[1], '0'),
+                (0, ACTIVITIES[1], '4.00'),
+            ]
+        ]
+        self.client.force_authenticate(self.user)
+        response = self.client.put('/api/timesheets/week-grid/', {
+            'week_start_date': self.monday.isoformat(), 'cells': cells,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TimesheetDailyRollup.objects.count(), 2)
+        self.assertRollupsInSync()
+
+
+@eager_celery
+class DashboardCacheTests(APITestCase):
+    filters = AdminDashboardTests.filters
+    date_range = (date.today() - timedelta(days=14), date.today())
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='cache@example.com', password='secret'
+        )
+        self.project = Project.objects.create(name='Apollo')
+        self.project.set_activity_types(ACTIVITIES)
+        self.timesheet = self.create(ACTIVITIES[0])
+
+    def create(self, activity):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Timesheet.objects.create(
+                user=self.user, project=self.project, activity_type=activity,
+                date=date.today() - timedelta(days=1), hours_worked='2.00',
+            )
+
+    def dashboard(self):
+        def build():
+            self.builds += 1
+            return build_admin_dashboard(self.filters, self.date_range)
+
+        return get_or_build_dashboard(self.filters, self.date_range, build)
+
+    def assertRebuiltAfter(self, write):
+        """The cached dashboard is served until `write` commits, then rebuilt"""
+        self.builds = 0
+        cached = self.dashboard()
+        self.assertEqual(self.dashboard(), cached)
+        self.assertEqual(self.builds, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        rebuilt = self.dashboard()
+        self.assertEqual(self.builds, 2)
+        return cached, rebuilt
+
+    def test_timesheet_save(self):
+        def save():
+            self.timesheet.hours_worked = Decimal('5.00')
+            self.timesheet.save()
+
+        cached, rebuilt = self.assertRebuiltAfter(save)
+        self.assertEqual(cached['dashboard_stats']['total_hours'], 2.0)
+        self.assertEqual(rebuilt['dashboard_stats']['total_hours'], 5.0)
+
+    def test_timesheet_delete(self):
+        cached, rebuilt = self.assertRebuiltAfter(self.timesheet.delete)
+        self.assertEqual((cached['total_count'], rebuilt['total_count']), (1, 0))
+
+    def test_bulk_submit(self):
+        drafts = [self.timesheet, self.create(ACTIVITIES[1])]
+        cached, rebuilt = self.assertRebuiltAfter(
+            lambda: bulk_submit_timesheets(drafts)
+        )
+        self.assertEqual(cached['dashboard_stats']['submitted_count'], 0)
+        self.assertEqual(rebuilt['dashboard_stats']['submitted_count'], 2)
+
+    def test_user_rename(self):
+        def rename():
+            self.user.first_name = 'Grace'
+            self.user.save()
+
+        cached, rebuilt = self.assertRebuiltAfter(rename)
+        self.assertEqual(cached['top_users'][0]['user__first_name'], '')
+        self.assertEqual(rebuilt['top_users'][0]['user__first_name'], 'Grace')
+
+    def test_project_rename(self):
+        def rename():
+            self.project.name = 'Artemis'
+            self.project.save()
+
+        cached, rebuilt = self.assertRebuiltAfter(rename)
+        self.assertEqual(cached['top_projects'][0]['project__name'], 'Apollo')
+        self.assertEqual(rebuilt['top_projects'][0]['project__name'], 'Artemis')
+
+
+@eager_celery
+class ExportJobTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, export_dir, ignore_errors=True)
+        export_settings = self.settings(TIMESHEET_EXPORT_DIR=export_dir)
+        export_settings.enable()
+        self.addCleanup(export_settings.disable)
+        # Celery copies task options when the task is bound, which may be before
+        # any override applied, so the status endpoint would only ever see PENDING
+        store_result = mock.patch.object(
+            export_timesheets_task, 'store_eager_result', True
+        )
+        store_result.start()
+        self.addCleanup(store_result.stop)
+
+        self.user = User.objects.create_user(
+            email='export@example.com', password='secret'
+        )
+        self.user.first_name, self.user.last_name = 'Ada', 'Lovelace'
+        self.user.staff = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        project = Project.objects.create(name='Apollo, phase 2')
+        project.set_activity_types(ACTIVITIES)
+        self.timesheets = [
+            Timesheet.objects.create(
+                user=self.user, project=project, activity_type=activity,
+                date=date(2024, 3, day), hours_worked=hours, description=description,
+            )
+            for day, activity, hours, description in [
+                (5, ACTIVITIES[1], '1.50', 'Said "done"\nthen left'),
+                (4, ACTIVITIES[0], '7.25', ''),
+            ]
+        ]
+
+    def start(self, **params):
+        response = self.client.post('/api/timesheets/export-jobs/', {
+            'date_from': '2024-03-01', 'date_to': '2024-03-31', **params,
+        })
+        self.assertEqual(response.status_code, 202)
+        return response.data['job_id']
+
+    def test_csv_export(self):
+        job_id = self.start(export_format='csv')
+
+        response = self.client.get(f'/api/timesheets/export-jobs/{job_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'SUCCESS')
+        self.assertEqual(
+            (response.data['rows_processed'], response.data['total_rows']), (2, 2)
+        )
+        self.assertTrue(response.data['download_url'].endswith(
+            f'/api/timesheets/export-jobs/{job_id}/download/'
+        ))
+
+        response = self.client.get(response.data['download_url'])
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode()
+        response.close()
+        rows = list(csv.DictReader(io.StringIO(content, newline='')))
+        self.assertEqual(list(rows[0]), EXPORT_HEADERS)
+        # Oldest first, with commas, quotes and newlines surviving the round trip
+        first, second = sorted(self.timesheets, key=lambda timesheet: timesheet.date)
+        self.assertEqual([row['id'] for row in rows], [str(first.id), str(second.id)])
+        self.assertEqual(rows[0]['date'], '2024-03-04')
+        self.assertEqual(rows[0]['user_email'], 'export@example.com')
+        self.assertEqual(rows[0]['user_name'], 'Ada Lovelace')
+        self.assertEqual(rows[0]['project_name'], 'Apollo, phase 2')
+        self.assertEqual(rows[0]['hours_worked'], '7.25')
+        self.assertEqual(rows[0]['submitted_at'], '')
+        self.assertEqual(rows[1]['description'], 'Said "done"\nthen left')
+        self.assertEqual(rows[1]['status'], 'draft')
+
+    def test_filters_are_applied(self):
+        job_id = self.start(date_from='2024-03-05')
+        response = self.client.get(f'/api/timesheets/export-jobs/{job_id}/download/')
+        content = b''.join(response.streaming_content).decode()
+        response.close()
+        self.assertEqual(len(list(csv.DictReader(io.StringIO(content)))), 1)
+
+    def test_jobs_of_other_users_are_hidden(self):
+        job_id = self.start()
+        other = User.objects.create_user(email='other@example.com', password='secret')
+        other.staff = True
+        other.save()
+        self.client.force_authenticate(other)
+        for url in (f'/api/timesheets/export-jobs/{job_id}/',
+                    f'/api/timesheets/export-jobs/{job_id}/download/'):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class RecordingCursor:
+    """Cursor stand-in that records statements and answers the partition listing"""
+
+    def __init__(self, bounds=()):
+        self.db = connection
+        self.statements = []
+        self.rows = [
+            (partition_name(date.fromisoformat(lower)),
+             f"FOR VALUES FROM ('{lower}') TO ('{upper}')")
+            for lower, upper in bounds
+        ] + [(DEFAULT_PARTITION, 'DEFAULT')]
+
+    def execute(self, sql, params=None):
+        self.statements.append((' '.join(sql.split()), params))
+
+    def fetchall(self):
+        return self.rows
+
+
+class PartitioningTests(SimpleTestCase):
+    def test_add_months(self):
+        for month, count, expected in [
+            (date(2024, 1, 1), 1, date(2024, 2, 1)),
+            (date(2024, 11, 1), 1, date(2024, 12, 1)),
+            (date(2024, 12, 1), 1, date(2025, 1, 1)),
+            (date(2024, 1, 1), -1, date(2023, 12, 1)),
+            (date(2024, 3, 1), -14, date(2023, 1, 1)),
+            (date(2024, 3, 1), 0, date(2024, 3, 1)),
+            (date(2024, 6, 1), 31, date(2027, 1, 1)),
+        ]:
+            with self.subTest(month=month, count=count):
+                self.assertEqual(add_months(month, count), expected)
+
+    def test_partition_ddl_bounds(self):
+        cursor = RecordingCursor()
+        name = create_month_partition(cursor, date(2024, 12, 1))
+        self.assertEqual(name, 'timesheets_timesheet_p2024_12')
+        (create, _), (move, move_params), (attach, attach_params) = cursor.statements
+        self.assertEqual(
+            create, 'CREATE TABLE "timesheets_timesheet_p2024_12" '
+            '(LIKE "timesheets_timesheet" INCLUDING DEFAULTS)'
+        )
+        # Half-open ranges: the upper bound is the first day of the next month
+        self.assertIn('date >= %s AND date < %s', move)
+        self.assertIn('FOR VALUES FROM (%s) TO (%s)', attach)
+        bounds = [date(2024, 12, 1), date(2025, 1, 1)]
+        self.assertEqual((move_params, attach_params), (bounds, bounds))
+
+    def test_list_partitions_skips_the_default(self):
+        cursor = RecordingCursor([('2024-02-01', '2024-03-01'),
+                                  ('2024-01-01', '2024-02-01')])
+        self.assertEqual(list_partitions(cursor), [
+            ('timesheets_timesheet_p2024_01', date(2024, 1, 1), date(2024, 2, 1)),
+            ('timesheets_timesheet_p2024_02', date(2024, 2, 1), date(2024, 3, 1)),
+        ])
+
+    def test_ensure_future_partitions_creates_only_missing_months(self):
+        cursor = RecordingCursor([('2024-12-01', '2025-01-01')])
+        created = ensure_future_partitions(cursor, 2, today=date(2024, 11, 20))
+        self.assertEqual(created, [
+            'timesheets_timesheet_p2024_11', 'timesheets_timesheet_p2025_01',
+        ])
+
+    def test_detach_old_partitions_keeps_the_retained_months(self):
+        cursor = RecordingCursor([('2024-01-01', '2024-02-01'),
+                                  ('2024-02-01', '2024-03-01'),
+                                  ('2024-03-01', '2024-04-01')])
+        detached = detach_old_partitions(cursor, 2, today=date(2024, 4, 15))
+        # Two months back from April is February, so only January has ended
+        self.assertEqual(detached, [
+            ('timesheets_timesheet_p2024_01', date(2024, 1, 1), date(2024, 2, 1)),
+        ])
+        self.assertEqual(cursor.statements[-1], (
+            'ALTER TABLE "timesheets_timesheet" '
+            'DETACH PARTITION "timesheets_timesheet_p2024_01"', None,
+        ))
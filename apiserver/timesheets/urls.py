@@ -1,5 +1,12 @@
 from django.urls import path
-from .views import BulkTimesheetActionsView, DraftsListView, FindExistingTimesheetView, GetAllTimesheetsView, MyTimesheetsView, ProjectActivitiesView, SubmitWeekTimesheetsView, TimesheetDetailView, TimesheetListCreateView, TimesheetSummaryView, UserInfoView, ValidateWeekTimesheetsView, WeekSummaryView
+from .views import (
+    BulkTimesheetActionsView, DraftsListView, FindExistingTimesheetView,
+    GetAllTimesheetsView, MyTimesheetsView, ProjectActivitiesView,
+    SubmitWeekTimesheetsView, TimesheetDetailView, TimesheetExportJobDetailView,
+    TimesheetExportJobDownloadView, TimesheetExportJobView, TimesheetExportView,
+    TimesheetListCreateView, TimesheetSummaryView, UserInfoView,
+    ValidateWeekTimesheetsView, WeekGridView, WeekSummaryView,
+)
 
 urlpatterns = [
     # Basic CRUD operations
@@ -26,6 +33,9 @@ urlpatterns = [
     # path('submit-week/', views.submit_week_timesheets, name='submit-week'),
     path('submit-week/', SubmitWeekTimesheetsView.as_view(), name='submit-week'),
 
+    # Save the whole project x activity x day grid for a week in one request
+    path('week-grid/', WeekGridView.as_view(), name='week-grid'),
+
     # path('week-summary/', views.get_week_summary, name='week-summary'),
     path('week-summary/', WeekSummaryView.as_view(), name='week-summary'),
 
@@ -56,5 +66,15 @@ urlpatterns = [
     path('all/', GetAllTimesheetsView.as_view(), name="get-all-timesheets"),
     # path("all/", get_all_timesheets, name="all-timesheets"),
 
+    # Streams the same filtered set as all/ without pagination or aggregates
+    path('export/', TimesheetExportView.as_view(), name="export-timesheets"),
+
+    # Background exports for ranges too large to stream within a request
+    path('export-jobs/', TimesheetExportJobView.as_view(), name="export-jobs"),
+    path('export-jobs/<str:job_id>/', TimesheetExportJobDetailView.as_view(),
+         name="export-job-detail"),
+    path('export-jobs/<str:job_id>/download/', TimesheetExportJobDownloadView.as_view(),
+         name="export-job-download"),
+
 
 ]
\ No newline at end of file
@@ -1,4 +1,16 @@
+from collections import Counter, defaultdict
 from datetime import datetime, date, timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from django.db.models import Q
+
+SEARCH_ID_LIMIT = 500
+MAX_DAILY_HOURS = Decimal('24')
+LONG_DAY_HOURS = Decimal('12')
+ADMIN_FILTER_PARAMS = [
+    "user_id", "project_id", "status", "activity_type", "user_search", "project_search"
+]
 
 def get_week_start_end_dates(date_input):
     """
@@ -59,13 +71,38 @@ def calculate_week_totals(timesheets):
     Returns:
         dict: Summary statistics
     """
-    # Convert to list if it's a QuerySet
-    if hasattr(timesheets, 'model'):  # Check if it's a QuerySet
-        timesheet_list = list(timesheets)
-    else:
-        timesheet_list = timesheets
+    return _sum_entries([
+        (
+            ts.date,
+            ts.project_id,
+            ts.project_name or (ts.project.name if ts.project else 'Unknown'),
+            ts.hours_worked,
+        )
+        for ts in timesheets
+    ])
+
+
+def calculate_row_totals(rows):
+    """
+    calculate_week_totals for values() rows
     
-    if not timesheet_list:
+    Args:
+        rows: dicts holding date, project_id, project_name and hours_worked
+    """
+    return _sum_entries([
+        (
+            row['date'],
+            row['project_id'],
+            row['project_name'] or 'Unknown',
+            row['hours_worked'],
+        )
+        for row in rows
+    ])
+
+
+def _sum_entries(entries):
+    """Summary statistics for (date, project id, project name, hours) tuples"""
+    if not entries:
         return {
             'total_hours': 0,
             'total_entries': 0,
@@ -75,50 +112,134 @@ def calculate_week_totals(timesheets):
             'project_totals': {}
         }
     
-    # Basic totals
-    total_hours = sum(float(ts.hours_worked) for ts in timesheet_list)
-    total_entries = len(timesheet_list)
-    
-    # Unique counts
-    unique_projects = len(set(ts.project_id for ts in timesheet_list))
-    unique_dates = len(set(ts.date for ts in timesheet_list))
-    
-    # Daily totals
     daily_totals = {}
-    for ts in timesheet_list:
-        date_str = ts.date.strftime('%Y-%m-%d')
-        if date_str not in daily_totals:
-            daily_totals[date_str] = 0
-        daily_totals[date_str] += float(ts.hours_worked)
-    
-    # Project totals
     project_totals = {}
-    for ts in timesheet_list:
-        project_name = ts.project_name or (ts.project.name if ts.project else 'Unknown')
-        if project_name not in project_totals:
-            project_totals[project_name] = 0
-        project_totals[project_name] += float(ts.hours_worked)
+    for day, _, project_name, hours in entries:
+        date_str = day.strftime('%Y-%m-%d')
+        amount = float(hours)
+        daily_totals[date_str] = daily_totals.get(date_str, 0) + amount
+        project_totals[project_name] = project_totals.get(project_name, 0) + amount
     
     return {
-        'total_hours': total_hours,
-        'total_entries': total_entries,
-        'unique_projects': unique_projects,
-        'unique_dates': unique_dates,
+        'total_hours': sum(float(hours) for _, _, _, hours in entries),
+        'total_entries': len(entries),
+        'unique_projects': len(set(project_id for _, project_id, _, _ in entries)),
+        'unique_dates': len(set(day for day, _, _, _ in entries)),
         'daily_totals': daily_totals,
         'project_totals': project_totals
     }
 
+
 def validate_week_timesheets(timesheets):
     """
-    Validate a week's worth of timesheets before submission
+    Validate timesheets for submission in one pass
+
+    Checks the rules Timesheet.clean enforces on submission (no future dates, activity
+    allowed on the project, active user and project) plus the 24 hour daily cap and
+    duplicate entries. Days are totalled together with the user's other timesheets in
+    the same weeks. Runs four queries whatever the row count: projects, their activity
+    types, users, and the other timesheets of those weeks.
+
+    Args:
+        timesheets: list of Timesheet objects
+
+    Returns:
+        dict: is_valid, has_warnings, timesheet_errors ({'timesheet_id', 'errors'} for
+        every row that cannot be submitted), week_warnings and summary
     """
-    return {
+    from accounts.models import User
+    from projects.models import Project
+    from .models import Timesheet
+
+    timesheets = list(timesheets)
+    result = {
         'is_valid': True,
         'has_warnings': False,
         'timesheet_errors': [],
         'week_warnings': [],
         'summary': calculate_week_totals(timesheets)
     }
+    if not timesheets:
+        return result
+
+    today = date.today()
+    projects = Project.objects.prefetch_related('activity_type_entries').in_bulk(
+        {ts.project_id for ts in timesheets}
+    )
+    user_ids = {ts.user_id for ts in timesheets}
+    active_user_ids = set(
+        User.objects.filter(id__in=user_ids, active=True).values_list('id', flat=True)
+    )
+
+    # Every week touched, with the rest of the user's entries in those weeks
+    weeks = sorted(
+        {(ts.user_id, get_week_start_end_dates(ts.date)[0]) for ts in timesheets}
+    )
+    # Exactly those weeks, so two distant weeks don't load every row in between
+    week_filter = reduce(or_, (
+        Q(user_id=user_id, date__range=[week_start, week_start + timedelta(days=6)])
+        for user_id, week_start in weeks
+    ))
+    others = (
+        Timesheet.objects.filter(week_filter)
+        .exclude(id__in=[ts.id for ts in timesheets if ts.id])
+        .order_by()
+        .values_list('user_id', 'project_id', 'date', 'activity_type', 'hours_worked')
+    )
+
+    day_totals = defaultdict(Decimal)
+    entry_counts = Counter()
+    for user_id, project_id, day, activity_type, hours in others:
+        day_totals[user_id, day] += hours
+        entry_counts[user_id, project_id, day, activity_type] += 1
+    for ts in timesheets:
+        day_totals[ts.user_id, ts.date] += Decimal(str(ts.hours_worked))
+        entry_counts[ts.user_id, ts.project_id, ts.date, ts.activity_type] += 1
+
+    for ts in timesheets:
+        errors = []
+        project = projects[ts.project_id]
+        if ts.date > today:
+            errors.append('Date cannot be in the future.')
+        project_activities = project.activity_type_set()
+        if project_activities and ts.activity_type not in project_activities:
+            errors.append(
+                f'Activity type "{ts.activity_type}" is not valid for project '
+                f'"{project.name}". '
+                f'Valid activities: {", ".join(project.get_activity_types())}'
+            )
+        if ts.user_id not in active_user_ids:
+            errors.append('Cannot submit timesheet for inactive user.')
+        if project.status != 'active':
+            errors.append('Cannot submit timesheet for inactive project.')
+        day_total = day_totals[ts.user_id, ts.date]
+        if day_total > MAX_DAILY_HOURS:
+            errors.append(
+                f'Total hours for {ts.date} would be {day_total}, '
+                f'above the {MAX_DAILY_HOURS} hour daily limit.'
+            )
+        if entry_counts[ts.user_id, ts.project_id, ts.date, ts.activity_type] > 1:
+            errors.append(
+                f'Duplicate entry for project "{project.name}" with activity '
+                f'"{ts.activity_type}" on {ts.date}.'
+            )
+        if errors:
+            result['timesheet_errors'].append({'timesheet_id': ts.id, 'errors': errors})
+
+    for user_id, week_start in weeks:
+        for offset in range(7):
+            day = week_start + timedelta(days=offset)
+            hours = day_totals.get((user_id, day), 0)
+            warnings = result['week_warnings']
+            if not hours and offset < 5 and day <= today:
+                warnings.append(f'No hours logged on {day:%A} {day}.')
+            elif LONG_DAY_HOURS < hours <= MAX_DAILY_HOURS:
+                warnings.append(f'{hours} hours logged on {day:%A} {day}.')
+
+    result['is_valid'] = not result['timesheet_errors']
+    result['has_warnings'] = bool(result['week_warnings'])
+    return result
+
 
 def format_week_range(week_start_date):
     """
@@ -135,4 +256,77 @@ def format_week_range(week_start_date):
     if week_start.month == week_end.month:
         return f"{week_start.strftime('%b %d')}-{week_end.strftime('%d, %Y')}"
     else:
-        return f"{week_start.strftime('%b %d')} - {week_end.strftime('%b %d, %Y')}"
\ No newline at end of file
+        return f"{week_start.strftime('%b %d')} - {week_end.strftime('%b %d, %Y')}"
+
+
+def parse_admin_filters(params):
+    """
+    Read the admin listing filters from query parameters
+
+    Args:
+        params: QueryDict or dict of request parameters
+
+    Returns:
+        tuple: (filters, date_from, date_to, date_range) where date_from/date_to are
+        the raw strings and date_range is a (date, date) tuple. Defaults to the
+        current month.
+
+    Raises:
+        ValueError: if a date is not in YYYY-MM-DD format
+    """
+    filters = {k: params.get(k) for k in ADMIN_FILTER_PARAMS}
+    today = date.today()
+    date_from = params.get("date_from", today.replace(day=1).strftime("%Y-%m-%d"))
+    date_to = params.get("date_to", today.strftime("%Y-%m-%d"))
+    date_range = (datetime.strptime(date_from, "%Y-%m-%d").date(),
+                  datetime.strptime(date_to, "%Y-%m-%d").date())
+    return filters, date_from, date_to, date_range
+
+
+def apply_admin_filters(qs, filters, date_range):
+    """Apply the admin listing filters to a Timesheet or daily rollup queryset"""
+    if filters["user_id"]:
+        qs = qs.filter(user_id=filters["user_id"])
+    if filters["project_id"]:
+        qs = qs.filter(project_id=filters["project_id"])
+    if filters["status"]:
+        qs = qs.filter(status=filters["status"])
+    if filters["activity_type"]:
+        qs = qs.filter(activity_type__icontains=filters["activity_type"])
+    if filters["user_search"]:
+        qs = qs.filter(user_id__in=search_user_ids(filters["user_search"]))
+    if filters["project_search"]:
+        qs = qs.filter(project_id__in=search_project_ids(filters["project_search"]))
+    return qs.filter(date__gte=date_range[0], date__lte=date_range[1])
+
+
+def resolve_search_ids(queryset):
+    """
+    Resolve a search over a small table (users, projects) to primary keys up front
+
+    Filtering timesheets on a short literal id list lets Postgres use the (user, date)
+    and (project, date) indexes instead of joining every row against the search.
+    Very broad searches fall back to a subquery.
+    """
+    ids = list(queryset.order_by().values_list('id', flat=True)[:SEARCH_ID_LIMIT + 1])
+    if len(ids) > SEARCH_ID_LIMIT:
+        return queryset.order_by().values('id')
+    return ids
+
+
+def search_user_ids(term):
+    """Ids of users whose name or email contains the term (trigram-indexed)"""
+    from accounts.models import User
+
+    return resolve_search_ids(User.objects.filter(
+        Q(first_name__icontains=term)
+        | Q(last_name__icontains=term)
+        | Q(email__icontains=term)
+    ))
+
+
+def search_project_ids(term):
+    """Ids of projects whose name contains the term (trigram-indexed)"""
+    from projects.models import Project
+
+    return resolve_search_ids(Project.objects.filter(name__icontains=term))
@@ -1,13 +1,41 @@
+import os
 from datetime import datetime, date, timedelta
+from decimal import Decimal
 from django.db import transaction
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Max, Q, Subquery
+from django.db.models.functions import Coalesce
+from asgiref.sync import sync_to_async
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.cache import cache
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.urls import reverse
 import django_filters
 from rest_framework import generics, status
 from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Timesheet
+from apiserver.async_views import AsyncAPIView
+from apiserver.db_router import replica_reads
+from apiserver.pagination import (
+    DraftKeysetPagination,
+    EstimatedCountLimitOffsetPagination,
+    TimesheetKeysetPagination,
+)
+from apiserver.throttling import cost_class_for_range
+from .cache import get_or_build_dashboard
+from .conditional import (
+    atimesheet_validators, not_modified_response, set_validators, timesheet_validators,
+)
+from .exports import EXPORT_FORMATS, export_lines
+from .tasks import export_file_path, export_timesheets_task
+from .utils import (
+    ADMIN_FILTER_PARAMS, apply_admin_filters, get_week_start_end_dates,
+    parse_admin_filters,
+)
+from .models import Timesheet, TimesheetDailyRollup
 from projects.models import Project
 from .serializers import (
     TimesheetSerializer,
@@ -19,6 +47,7 @@ from .serializers import (
     WeekSubmissionSerializer,
     BulkTimesheetActionSerializer,
     WeekSummarySerializer,
+    WeekGridSerializer,
 )
 
 class TimesheetFilter(django_filters.FilterSet):
@@ -33,11 +62,22 @@ class TimesheetListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = TimesheetListSerializer
     filterset_class = TimesheetFilter
+    pagination_class = TimesheetKeysetPagination
 
     def get_queryset(self):
         return Timesheet.objects.filter(
             user=self.request.user
-        ).select_related("project").order_by("-date", "-created_at")
+        ).select_related("user").order_by("-date", "-created_at")
+
+    def list(self, request, *args, **kwargs):
+        # Rows come from values() and skip the model serializer,
+        # see TimesheetListSerializer.rows_data
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = TimesheetListSerializer.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(TimesheetListSerializer.rows_data(page))
+        return Response(TimesheetListSerializer.rows_data(rows))
 
     def create(self, request, *args, **kwargs):
         serializer = TimesheetCreateSerializer(data=request.data, context={"request": request})
@@ -66,50 +106,98 @@ class TimesheetDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = TimesheetSerializer
 
     def get_queryset(self):
-        return Timesheet.objects.filter(user=self.request.user)
-        
-class MyTimesheetsView(APIView):
+        return (
+            Timesheet.objects
+            .filter(user=self.request.user)
+            .select_related('user', 'project')
+            .prefetch_related('project__activity_type_entries')
+            .with_daily_totals()
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        # The payload covers the row, its day's total and the project's activity types
+        day = (Timesheet.objects.filter(pk=self.kwargs['pk'], user=request.user)
+               .values('date')[:1])
+        validators = timesheet_validators(
+            request.user.id,
+            Timesheet.objects.filter(user=request.user, date=Subquery(day)),
+            project_update=Max('project__updated_at'),
+        )
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(super().retrieve(request, *args, **kwargs), validators)
+
+
+class MyTimesheetsView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    async def get(self, request):
         today = date.today()
         date_from = request.GET.get('date_from') or (today - timedelta(days=today.weekday()))
         date_to = request.GET.get('date_to') or today
 
-        timesheets = (Timesheet.objects
-            .filter(user=request.user, date__range=[date_from, date_to])
-            .select_related('project')
-            .order_by('-date'))
+        timesheets = Timesheet.objects.filter(
+            user=request.user, date__range=[date_from, date_to]
+        )
+        validators = await atimesheet_validators(request.user.id, timesheets)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        # One fetch; every summary figure is derived from the loaded rows
+        rows = TimesheetListSerializer.values(timesheets.order_by('-date'))
+        rows = [row async for row in rows]
 
         summary = {
-            'total_hours': float(timesheets.aggregate(Sum('hours_worked'))['hours_worked__sum'] or 0),
-            'total_entries': timesheets.count(),
-            'draft_count': timesheets.filter(status='draft').count(),
-            'submitted_count': timesheets.filter(status='submitted').count(),
+            'total_hours': float(
+                sum((row['hours_worked'] for row in rows), Decimal('0'))
+            ),
+            'total_entries': len(rows),
+            'draft_count': sum(1 for row in rows if row['status'] == 'draft'),
+            'submitted_count': sum(1 for row in rows if row['status'] == 'submitted'),
             'date_range': f"{date_from} to {date_to}"
         }
 
-        return Response({
-            'timesheets': TimesheetListSerializer(timesheets, many=True).data,
+        return set_validators(Response({
+            'timesheets': TimesheetListSerializer.rows_data(rows),
             'summary': summary
-        })
-    
-class DraftsListView(APIView):
+        }), validators)
+
+
+class DraftsListView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    async def get(self, request):
         """Get current user's draft timesheets"""
         drafts = Timesheet.objects.filter(
             user=request.user,
             status='draft'
-        ).select_related('project').order_by('-created_at')
-
+        ).order_by('-created_at')
+
+        validators = await atimesheet_validators(request.user.id, drafts)
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        if DraftKeysetPagination.is_requested(request):
+            paginator = DraftKeysetPagination()
+            paginate = sync_to_async(paginator.paginate_queryset)
+            page = await paginate(drafts, request, view=self)
+            total_drafts = await drafts.acount()
+            return set_validators(Response({
+                'drafts': TimesheetDraftSerializer(page, many=True).data,
+                'total_drafts': total_drafts,
+                'pagination': paginator.get_pagination_info()
+            }), validators)
+
+        drafts = [ts async for ts in drafts]
         serializer = TimesheetDraftSerializer(drafts, many=True)
 
-        return Response({
+        return set_validators(Response({
             'drafts': serializer.data,
-            'total_drafts': drafts.count()
-        })
+            'total_drafts': len(drafts)
+        }), validators)
 
 class SubmitWeekTimesheetsView(APIView):
     permission_classes = [IsAuthenticated]
@@ -122,15 +210,42 @@ class SubmitWeekTimesheetsView(APIView):
         result = serializer.save()   
         return Response(result)
 
-class WeekSummaryView(APIView):
+
+class WeekGridView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    def put(self, request):
+        """Save a whole week of draft cells in one transaction"""
+        serializer = WeekGridSerializer(
+            data=request.data, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save())
+
+
+class WeekSummaryView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    use_read_replica = True
+
+    async def get(self, request):
         serializer = WeekSummarySerializer(
             data=request.GET, context={'request': request}
         )
         serializer.is_valid(raise_exception=True)
-        return Response(serializer.data)
+
+        week_start, week_end = get_week_start_end_dates(
+            serializer.validated_data['week_start']
+        )
+        validators = await atimesheet_validators(
+            request.user.id,
+            Timesheet.objects.filter(
+                user=request.user, date__range=[week_start, week_end]
+            ),
+        )
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(Response(await serializer.adata()), validators)
 
 class ValidateWeekTimesheetsView(APIView):
     permission_classes = [IsAuthenticated]
@@ -155,9 +270,16 @@ class BulkTimesheetActionsView(APIView):
 class TimesheetSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_cost_class(self, request):
+        return cost_class_for_range(*self.date_range(request))
+
+    def date_range(self, request):
+        return (request.GET.get("date_from", (date.today() - timedelta(days=30))),
+                request.GET.get("date_to", date.today()))
+
+    @method_decorator(replica_reads)
     def get(self, request):
-        date_from = request.GET.get("date_from", (date.today() - timedelta(days=30)))
-        date_to = request.GET.get("date_to", date.today())
+        date_from, date_to = self.date_range(request)
 
         serializer = TimesheetSummarySerializer.build(request.user, date_from, date_to)
         return Response(serializer.data)
@@ -167,7 +289,9 @@ class ProjectActivitiesView(APIView):
 
     def get(self, request, project_id):
         """Get available activity types for a specific project"""
-        project = get_object_or_404(Project, id=project_id)
+        project = get_object_or_404(
+            Project.objects.prefetch_related('activity_type_entries'), id=project_id
+        )
 
         return Response({
             "project_id": project_id,
@@ -175,10 +299,11 @@ class ProjectActivitiesView(APIView):
             "activity_types": project.get_activity_types()
         })
 
-class UserInfoView(APIView):
+
+class UserInfoView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    async def get(self, request):
         """Get current user information for timesheets"""
         return Response({
             'user_id': request.user.id,
@@ -209,12 +334,15 @@ class FindExistingTimesheetView(APIView):
             return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=400)
 
         # Check if timesheet exists
-        timesheet = Timesheet.objects.filter(
-            user=request.user,
-            project_id=project_id,
-            activity_type=activity_type,
-            date=date_obj
-        ).first()
+        timesheet = (
+            Timesheet.objects
+            .select_related('user', 'project')
+            .prefetch_related('project__activity_type_entries')
+            .with_daily_totals()
+            .filter(user=request.user, project_id=project_id,
+                    activity_type=activity_type, date=date_obj)
+            .first()
+        )
 
         # Return response
         return Response({
@@ -224,78 +352,247 @@ class FindExistingTimesheetView(APIView):
                        f'with activity "{activity_type}" on {date_str}'
         })
 
+
+def build_admin_dashboard(filters, date_range):
+    """Compute the admin dashboard aggregates from the daily rollup"""
+    rollups = apply_admin_filters(
+        TimesheetDailyRollup.objects.all(), filters, date_range
+    )
+
+    agg = rollups.aggregate(
+        total_count=Coalesce(Sum("entry_count"), 0),
+        total_hours=Sum("total_hours"),
+        unique_users=Count("user", distinct=True),
+        unique_projects=Count("project", distinct=True),
+        draft_count=Coalesce(Sum("entry_count", filter=Q(status="draft")), 0),
+        submitted_count=Coalesce(Sum("entry_count", filter=Q(status="submitted")), 0)
+    )
+    totals = {"total_hours": Sum("total_hours"), "entry_count": Sum("entry_count")}
+    top_users = list(
+        rollups.values("user__first_name", "user__last_name", "user__email")
+        .annotate(**totals).order_by("-total_hours")[:10]
+    )
+    top_projects = list(
+        rollups.values("project__name")
+        .annotate(**totals, unique_users=Count("user", distinct=True))
+        .order_by("-total_hours")[:10]
+    )
+
+    return {
+        "total_count": agg["total_count"],
+        "dashboard_stats": {
+            "total_timesheets": agg["total_count"],
+            "total_hours": float(agg["total_hours"] or 0),
+            "unique_users": agg["unique_users"],
+            "unique_projects": agg["unique_projects"],
+            "draft_count": agg["draft_count"],
+            "submitted_count": agg["submitted_count"],
+        },
+        "top_users": top_users,
+        "top_projects": top_projects,
+    }
+
 class GetAllTimesheetsView(APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_cost_class(self, request):
+        if not (request.user.is_staff or request.user.is_admin):
+            return None  # refused with a 403 without taking a slot
+        try:
+            date_range = parse_admin_filters(request.GET)[3]
+        except ValueError:
+            return None  # answered with a 400 before touching the database
+        return cost_class_for_range(*date_range, default="medium")
+
+    @method_decorator(replica_reads)
     def get(self, request):
         if not (request.user.is_staff or request.user.is_admin):
             return Response({"error": "Insufficient permissions", "message": "Admin privileges required"},
                             status=status.HTTP_403_FORBIDDEN)
 
-        qs = Timesheet.objects.select_related("user", "project").order_by("-date", "-created_at")
-
         # Filters
-        filters = {k: request.GET.get(k) for k in ["user_id", "project_id", "status", "activity_type",
-                                                   "user_search", "project_search"]}
-        if filters["user_id"]: qs = qs.filter(user_id=filters["user_id"])
-        if filters["project_id"]: qs = qs.filter(project_id=filters["project_id"])
-        if filters["status"]: qs = qs.filter(status=filters["status"])
-        if filters["activity_type"]: qs = qs.filter(activity_type__icontains=filters["activity_type"])
-        if filters["user_search"]:
-            qs = qs.filter(Q(user__first_name__icontains=filters["user_search"]) |
-                           Q(user__last_name__icontains=filters["user_search"]) |
-                           Q(user__email__icontains=filters["user_search"]))
-        if filters["project_search"]: qs = qs.filter(project__name__icontains=filters["project_search"])
-
-        # Date filter
-        today = date.today()
-        date_from = request.GET.get("date_from", today.replace(day=1).strftime("%Y-%m-%d"))
-        date_to = request.GET.get("date_to", today.strftime("%Y-%m-%d"))
         try:
-            qs = qs.filter(date__gte=datetime.strptime(date_from, "%Y-%m-%d").date(),
-                           date__lte=datetime.strptime(date_to, "%Y-%m-%d").date())
+            filters, date_from, date_to, date_range = parse_admin_filters(request.GET)
         except ValueError:
             return Response({"error": "Invalid date format (YYYY-MM-DD required)"}, status=400)
 
-        # Pagination
-        page_size = min(int(request.GET.get("page_size", 100)), 500)
-        offset = int(request.GET.get("offset", 0))
-        paginated = qs[offset:offset + page_size]
-        serializer = TimesheetListSerializer(paginated, many=True)
-        total_count = qs.count()
-
-        # Aggregates
-        agg = qs.aggregate(
-            total_hours=Sum("hours_worked"),
-            unique_users=Count("user", distinct=True),
-            unique_projects=Count("project", distinct=True),
-            draft_count=Count("id", filter=Q(status="draft")),
-            submitted_count=Count("id", filter=Q(status="submitted"))
+        qs = TimesheetListSerializer.values(apply_admin_filters(
+            Timesheet.objects.order_by("-date", "-created_at"), filters, date_range
+        ))
+        # Aggregates come from the daily rollup, cached until a write touches the range
+        dashboard = get_or_build_dashboard(
+            filters, date_range, lambda: build_admin_dashboard(filters, date_range)
         )
+        # Summed from the rollup, so exact without counting timesheet rows
+        total_count = dashboard["total_count"]
+
+        # Pagination - keyset when a cursor is requested, offset otherwise
+        page_size = min(int(request.GET.get("page_size", 100)), 500)
+        if TimesheetKeysetPagination.is_requested(request):
+            paginator = TimesheetKeysetPagination()
+            paginator.page_size = page_size
+            paginated = paginator.paginate_queryset(qs, request, view=self)
+            pagination = {"total_count": total_count, "count_is_exact": True,
+                          **paginator.get_pagination_info()}
+        else:
+            # The rollup total unless ?count=estimated asks for the planner's
+            paginator = EstimatedCountLimitOffsetPagination(exact_count=total_count)
+            paginator.limit_query_param = "page_size"
+            paginator.default_limit = paginator.max_limit = page_size
+            paginated = paginator.paginate_queryset(qs, request, view=self)
+            pagination = {
+                "total_count": paginator.count,
+                "count_is_exact": paginator.count_is_exact,
+                "page_size": paginator.limit,
+                "offset": paginator.offset,
+                "has_more": paginator.offset + paginator.limit < paginator.count,
+            }
         dashboard_stats = {
-            "total_timesheets": total_count,
-            "total_hours": float(agg["total_hours"] or 0),
-            "unique_users": agg["unique_users"],
-            "unique_projects": agg["unique_projects"],
-            "draft_count": agg["draft_count"],
-            "submitted_count": agg["submitted_count"],
-            "date_range": f"{date_from} to {date_to}"
+            **dashboard["dashboard_stats"], "date_range": f"{date_from} to {date_to}"
         }
 
-        top_users = list(qs.values("user__first_name", "user__last_name", "user__email")
-                         .annotate(total_hours=Sum("hours_worked"), entry_count=Count("id"))
-                         .order_by("-total_hours")[:10])
-        top_projects = list(qs.values("project__name")
-                            .annotate(total_hours=Sum("hours_worked"), entry_count=Count("id"),
-                                      unique_users=Count("user", distinct=True))
-                            .order_by("-total_hours")[:10])
-
         return Response({
-            "timesheets": serializer.data,
-            "pagination": {"total_count": total_count, "page_size": page_size, "offset": offset,
-                           "has_more": (offset + page_size) < total_count},
+            "timesheets": TimesheetListSerializer.rows_data(paginated),
+            "pagination": pagination,
             "dashboard_stats": dashboard_stats,
-            "top_users": top_users,
-            "top_projects": top_projects,
+            "top_users": dashboard["top_users"],
+            "top_projects": dashboard["top_projects"],
             "filters_applied": {**filters, "date_from": date_from, "date_to": date_to},
         })
+
+
+class TimesheetExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_cost_class(self, request):
+        # Holds a database connection for as long as the stream runs; non-admins are
+        # refused with a 403 without taking a slot
+        if request.user.is_staff or request.user.is_admin:
+            return "heavy"
+        return None
+
+    def get(self, request):
+        """Stream every timesheet matching the admin filters as CSV or NDJSON"""
+        if not (request.user.is_staff or request.user.is_admin):
+            return Response(
+                {
+                    "error": "Insufficient permissions",
+                    "message": "Admin privileges required",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        export_format = request.GET.get("export_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            formats = ", ".join(EXPORT_FORMATS)
+            return Response(
+                {"error": f"Unsupported export format. Use one of: {formats}"},
+                status=400,
+            )
+        try:
+            filters, date_from, date_to, date_range = parse_admin_filters(request.GET)
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format (YYYY-MM-DD required)"}, status=400
+            )
+
+        qs = apply_admin_filters(Timesheet.objects.all(), filters, date_range)
+        response = StreamingHttpResponse(export_lines(qs, export_format),
+                                         content_type=EXPORT_FORMATS[export_format])
+        response["Content-Disposition"] = (
+            f'attachment; filename="timesheets_{date_from}_{date_to}.{export_format}"'
+        )
+        return response
+
+
+def _export_job_cache_key(job_id):
+    return f"timesheets:export-job:{job_id}"
+
+
+class TimesheetExportJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Queue a background export for the given admin filters"""
+        if not (request.user.is_staff or request.user.is_admin):
+            return Response(
+                {
+                    "error": "Insufficient permissions",
+                    "message": "Admin privileges required",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        export_format = request.data.get("export_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            formats = ", ".join(EXPORT_FORMATS)
+            return Response(
+                {"error": f"Unsupported export format. Use one of: {formats}"},
+                status=400,
+            )
+        names = [*ADMIN_FILTER_PARAMS, "date_from", "date_to"]
+        params = {k: request.data.get(k) for k in names if request.data.get(k)}
+        try:
+            parse_admin_filters(params)
+        except ValueError:
+            return Response(
+                {"error": "Invalid date format (YYYY-MM-DD required)"}, status=400
+            )
+
+        result = export_timesheets_task.delay(params, export_format)
+        cache.set(_export_job_cache_key(result.id),
+                  {"user_id": request.user.id, "export_format": export_format},
+                  settings.TIMESHEET_EXPORT_TTL.total_seconds())
+        return Response(
+            {"job_id": result.id, "status": result.state},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class TimesheetExportJobDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_job(self, request, job_id):
+        job = cache.get(_export_job_cache_key(job_id))
+        if not job or job["user_id"] != request.user.id:
+            return None
+        return job
+
+    def get(self, request, job_id):
+        """Report progress of an export job"""
+        job = self.get_job(request, job_id)
+        if not job:
+            return Response(
+                {"error": "Export job not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        result = AsyncResult(job_id)
+        info = result.info if isinstance(result.info, dict) else {}
+        payload = {
+            "job_id": job_id,
+            "status": result.state,
+            "rows_processed": info.get("rows", 0),
+            "total_rows": info.get("total_rows"),
+        }
+        if result.state == "FAILURE":
+            payload["error"] = str(result.info)
+        if result.state == "SUCCESS":
+            payload["download_url"] = request.build_absolute_uri(
+                reverse("export-job-download", kwargs={"job_id": job_id})
+            )
+        return Response(payload)
+
+
+class TimesheetExportJobDownloadView(TimesheetExportJobDetailView):
+
+    def get(self, request, job_id):
+        """Download the finished export file"""
+        job = self.get_job(request, job_id)
+        path = export_file_path(job_id, job["export_format"]) if job else None
+        if not path or not os.path.exists(path):
+            return Response(
+                {"error": "Export file not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        return FileResponse(open(path, "rb"), as_attachment=True,  # noqa: SIM115
+                            filename=os.path.basename(path),
+                            content_type=EXPORT_FORMATS[job["export_format"]])